@@ -0,0 +1,432 @@
+import numpy as np
+from cell import CellWallLabels
+from grid import WALL_BITS
+from mazefile import PackedWalls
+
+
+# The analysis works on a NumPy array of the wall bitmasks of every cell
+# instead of asking the maze about one wall at a time, so it needs NumPy.
+# The rest of the maze engine does not.
+#
+# The passages of each cell are kept in a (cells, 4) array of booleans with
+# one column for each direction, in clockwise order. The order matters for
+# the Euler tour used by distance_field().
+_UP = 0
+_RIGHT = 1
+_DOWN = 2
+_LEFT = 3
+
+
+# _NEXT_PASSAGE[(mask << 2) + d] is the first direction after d (in
+# clockwise order) with a passage in the mask of a cell's passages, where
+# bit d of the mask is set if the cell has a passage in direction d. It is
+# -1 if the cell has no passages.
+_NEXT_PASSAGE = np.array(
+    [
+        next((d + turn) % 4 for turn in range(1, 5) if mask & (1 << ((d + turn) % 4)))
+        if mask else -1
+        for mask in range(16)
+        for d in range(4)
+    ],
+    dtype=np.int64,
+)
+
+
+class MazeStatistics:
+    """
+    MazeStatistics holds the statistics of a maze.
+
+    - dead_ends: the number of cells with a single passage.
+    - junctions: the number of cells with three or four passages.
+    - branching_factor: the mean number of ways forward from a junction
+      (its passages minus the one it was entered through).
+    - corridor_lengths: the length (in cells) of every corridor, where a
+      corridor is a run of connected cells that each have exactly two
+      passages.
+    - distances: the distance field, a (height, width) array holding the
+      length of the shortest path from the start cell to every cell, or -1
+      for the cells that cannot be reached.
+    """
+
+    def __init__(
+            self,
+            dead_ends: int,
+            junctions: int,
+            branching_factor: float,
+            corridor_lengths: np.ndarray,
+            distances: np.ndarray,
+    ) -> None:
+        self.dead_ends = dead_ends
+        self.junctions = junctions
+        self.branching_factor = branching_factor
+        self.corridor_lengths = corridor_lengths
+        self.distances = distances
+
+    def distance_histogram(self) -> np.ndarray:
+        """
+        returns the number of cells at each distance from the start cell.
+        """
+        return np.bincount(self.distances[self.distances >= 0])
+
+
+def wall_array(walls, height: int, width: int) -> np.ndarray:
+    """
+    returns the wall bitmasks as a (height, width) array. The walls can be
+    the walls of a Maze (see Maze.get_walls), including the walls of a
+    loaded maze file, or any other bytes-like object or array.
+    """
+    if isinstance(walls, PackedWalls):
+        packed = np.frombuffer(walls.packed(), dtype=np.uint8)
+        packed = packed.reshape(height, -1)
+        unpacked = np.empty((height, packed.shape[1] * 2), dtype=np.uint8)
+        unpacked[:, 0::2] = packed & 0x0F
+        unpacked[:, 1::2] = packed >> 4
+        del packed
+        return unpacked[:, :width].copy()
+
+    return np.frombuffer(walls, dtype=np.uint8).reshape(height, width)
+
+
+def passages(walls: np.ndarray) -> np.ndarray:
+    """
+    returns a (cells, 4) array recording whether each cell has a passage to
+    the neighbouring cell above, to the right, below and to the left of it.
+    There is only a passage where the walls on both sides are down, and the
+    openings to the outside of the maze (the entrance and the exit) are not
+    passages.
+    """
+    height, width = walls.shape
+    down_open = (walls[:-1, :] & WALL_BITS[CellWallLabels.BOTTOM]) == 0
+    down_open &= (walls[1:, :] & WALL_BITS[CellWallLabels.TOP]) == 0
+    right_open = (walls[:, :-1] & WALL_BITS[CellWallLabels.RIGHT]) == 0
+    right_open &= (walls[:, 1:] & WALL_BITS[CellWallLabels.LEFT]) == 0
+
+    opens = np.zeros((height, width, 4), dtype=bool)
+    opens[:-1, :, _DOWN] = down_open
+    opens[1:, :, _UP] = down_open
+    opens[:, :-1, _RIGHT] = right_open
+    opens[:, 1:, _LEFT] = right_open
+
+    return opens.reshape(height * width, 4)
+
+
+def analyse(walls, height: int, width: int, start: int = 0) -> MazeStatistics:
+    """
+    returns the statistics of the maze with the given walls (see
+    wall_array). The distance field is measured from the cell at the start
+    index, which defaults to the top left cell.
+    """
+    grid = wall_array(walls, height, width)
+    opens = passages(grid)
+    degrees = opens.sum(axis=1, dtype=np.int8)
+
+    junctions = degrees >= 3
+    branching_factor = 0.0
+    if junctions.any():
+        branching_factor = float((degrees[junctions] - 1).mean())
+
+    return MazeStatistics(
+        dead_ends=int(np.count_nonzero(degrees == 1)),
+        junctions=int(np.count_nonzero(junctions)),
+        branching_factor=branching_factor,
+        corridor_lengths=corridor_lengths(opens, width),
+        distances=distance_field(opens, width, start).reshape(height, width),
+    )
+
+
+def analyse_maze(m) -> MazeStatistics:
+    """
+    returns the statistics of a generated Maze, with the distance field
+    measured from its entrance.
+    """
+    return analyse(
+        m.get_walls(),
+        m.get_last_i() + 1,
+        m.get_last_j() + 1,
+        m.get_entrance().get_index(),
+    )
+
+
+def _passage_masks(opens: np.ndarray) -> np.ndarray:
+    """
+    returns the passages of each cell as a 4-bit mask, where bit d is set if
+    the cell has a passage in direction d.
+    """
+    masks = np.zeros(len(opens), dtype=np.uint8)
+    for direction in range(4):
+        masks |= opens[:, direction].view(np.uint8) << direction
+    return masks
+
+
+def _offsets(width: int) -> np.ndarray:
+    """
+    returns the index offset of the neighbouring cell in each direction.
+    """
+    offsets = np.empty(4, dtype=np.int64)
+    offsets[_UP] = -width
+    offsets[_RIGHT] = 1
+    offsets[_DOWN] = width
+    offsets[_LEFT] = -1
+    return offsets
+
+
+def _neighbours(opens: np.ndarray, width: int):
+    """
+    returns the first and the last neighbour (in clockwise order) that each
+    cell has a passage to, or -1 for a cell with no passages. For a cell
+    with two passages these are its two neighbours.
+    """
+    cells = np.arange(len(opens))
+    offsets = _offsets(width)
+    first = np.full(len(opens), -1, dtype=np.int64)
+    last = np.full(len(opens), -1, dtype=np.int64)
+    for direction in range(4):
+        last = np.where(opens[:, direction], cells + offsets[direction], last)
+    for direction in reversed(range(4)):
+        first = np.where(opens[:, direction], cells + offsets[direction], first)
+    return first, last
+
+
+def corridor_lengths(opens: np.ndarray, width: int) -> np.ndarray:
+    """
+    returns the length of every corridor (see MazeStatistics).
+
+    A walker starts at each end of every corridor and they all take a step
+    along their corridors at the same time until they reach its other end,
+    so the number of rounds is the length of the longest corridor. Each
+    corridor is walked from both ends, so every length is found twice.
+    """
+    degrees = opens.sum(axis=1, dtype=np.int8)
+    corridor = degrees == 2
+    cells = np.flatnonzero(corridor)
+    if len(cells) == 0:
+        return np.zeros(0, dtype=np.int64)
+    first, last = _neighbours(opens, width)
+
+    # The ends of a corridor are the cells with a neighbour outside of the
+    # corridor. The walkers start by stepping in from outside.
+    lengths = [np.zeros(0, dtype=np.int64)]
+    for outside in (first[cells], last[cells]):
+        is_end = ~corridor[outside]
+        previous = outside[is_end]
+        current = cells[is_end]
+        length = np.ones(len(current), dtype=np.int64)
+        while len(current) > 0:
+            following = first[current]
+            following = np.where(following == previous, last[current], following)
+            done = ~corridor[following]
+            lengths.append(length[done])
+            keep = ~done
+            previous = current[keep]
+            current = following[keep]
+            length = length[keep] + 1
+
+    lengths = np.sort(np.concatenate(lengths))[::2]
+
+    # A corridor that loops back onto itself has no ends, which can only
+    # happen when it is cut off from the rest of the maze.
+    if int(lengths.sum()) < len(cells):
+        lengths = np.concatenate((lengths, _loop_lengths(corridor, first, last)))
+    return lengths
+
+
+def _loop_lengths(corridor: np.ndarray, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """
+    returns the lengths of the corridors which loop back onto themselves.
+    These are the corridor cells left over after walking every corridor
+    from its ends, and there are so few of them that they are walked one
+    cell at a time.
+    """
+    seen = ~corridor
+    cells = np.flatnonzero(corridor)
+    is_end = ~corridor[first[cells]] | ~corridor[last[cells]]
+    current = cells[is_end]
+    previous = np.where(corridor[first[current]], last[current], first[current])
+    while len(current) > 0:
+        seen[current] = True
+        following = first[current]
+        following = np.where(following == previous, last[current], following)
+        keep = ~seen[following]
+        previous = current[keep]
+        current = following[keep]
+
+    lengths = []
+    for cell in np.flatnonzero(~seen):
+        if seen[cell]:
+            continue
+        length = 0
+        previous, current = -1, cell
+        while not seen[current]:
+            seen[current] = True
+            length += 1
+            following = first[current] if first[current] != previous else last[current]
+            previous, current = current, following
+        lengths.append(length)
+    return np.array(lengths, dtype=np.int64)
+
+
+def distance_field(opens: np.ndarray, width: int, start: int = 0) -> np.ndarray:
+    """
+    returns the length of the shortest path from the start cell to every
+    cell, or -1 for the cells that cannot be reached.
+
+    A perfect maze (a spanning tree) can have paths that are millions of
+    cells long, which would take a breadth-first search millions of rounds.
+    So when the maze is a tree the depth of every cell is found with an
+    Euler tour instead (see _tree_distances). Other mazes fall back to a
+    breadth-first search that expands a whole level of cells at a time.
+    """
+    distances = _tree_distances(opens, width, start)
+    if distances is None:
+        distances = _breadth_first_distances(opens, width, start)
+    return distances
+
+
+def _tree_distances(opens: np.ndarray, width: int, start: int):
+    """
+    returns the depth of every cell of the tree rooted at the start cell,
+    or None if the passages do not form a tree which spans the maze.
+
+    Walking around the tree while keeping a hand on the wall passes along
+    each passage twice, once going away from the start cell and once
+    coming back, and this walk is the Euler tour. The step after arriving
+    at a cell along a passage is to leave through the next passage in
+    clockwise order, so the order of the tour is found by ranking that
+    linked list (see _rank_list). The depth of a cell is then the number of
+    steps taken away from the start cell minus the number of steps taken
+    back towards it before arriving at the cell.
+    """
+    cells = len(opens)
+    distances = np.full(cells, -1, dtype=np.int64)
+    distances[start] = 0
+    if cells == 1:
+        return distances
+
+    # Each step (from a cell through one of its passages) is numbered by
+    # its position in the flattened opens array, which is then compacted so
+    # that only the passages are numbered.
+    flat = opens.reshape(-1)
+    steps = np.flatnonzero(flat)
+    if len(steps) != 2 * (cells - 1):
+        return None
+    number = np.full(len(flat), -1, dtype=np.int32)
+    number[steps] = np.arange(len(steps), dtype=np.int32)
+
+    step_directions = (steps & 3).astype(np.int8)
+    targets = (steps >> 2) + _offsets(width)[step_directions]
+    del steps
+
+    # Arriving at the target through the opposite direction, the tour
+    # leaves through the next passage clockwise from it, which is looked
+    # up from the passages of the target.
+    masks = _passage_masks(opens)
+    reverse = (targets << 2) + ((step_directions + 2) % 4)
+    del step_directions
+    leave = _NEXT_PASSAGE[(masks[targets].astype(np.int64) << 2) + (reverse & 3)]
+    following = number[reverse - (reverse & 3) + leave]
+    del leave
+
+    # The tour starts by leaving the start cell through its first passage.
+    first = _NEXT_PASSAGE[(int(masks[start]) << 2) + _LEFT]
+    if first < 0:
+        return None
+    positions = _rank_list(following, int(number[(start << 2) + first]))
+    del following
+    if positions is None:
+        return None
+
+    # A step goes away from the start cell if it comes before the step
+    # back along the same passage.
+    away = positions < positions[number[reverse]]
+    del number, reverse
+    signs = np.empty(len(positions), dtype=np.int64)
+    signs[positions] = np.where(away, 1, -1)
+    depths = np.cumsum(signs)[positions]
+    distances[targets[away]] = depths[away]
+
+    return distances
+
+
+def _rank_list(following: np.ndarray, head: int, spacing: int = 64):
+    """
+    returns the position of every item of a circular linked list, counting
+    from the head, where following[item] is the item after it. It returns
+    None if any item is not on the same list as the head.
+
+    The list is ranked with a ruling set. Every item whose number is a
+    multiple of the spacing (and the head) rules the items after it up to
+    the next ruler, and all the rulers walk their part of the list at the
+    same time. Each round only touches the rulers that are still walking,
+    so the whole list is only walked once. The short list of rulers is
+    then ranked on its own.
+    """
+    items = len(following)
+    rulers = np.unique(np.append(np.arange(0, items, spacing), head))
+    ruler_of = np.full(items, -1, dtype=np.int32)
+    ruler_of[rulers] = np.arange(len(rulers), dtype=np.int32)
+
+    # Every item records the ruler whose walk reached it and how many
+    # steps the walk had taken. next_ruler records the ruler each walk
+    # ended at and lengths records how many items it ruled.
+    owners = np.full(items, -1, dtype=np.int32)
+    owners[rulers] = np.arange(len(rulers), dtype=np.int32)
+    offsets = np.zeros(items, dtype=np.int64)
+    next_ruler = np.full(len(rulers), -1, dtype=np.int64)
+    lengths = np.zeros(len(rulers), dtype=np.int64)
+
+    walkers = np.arange(len(rulers), dtype=np.int32)
+    current = following[rulers]
+    walked = 1
+    while len(walkers) > 0:
+        reached = ruler_of[current]
+        stopped = reached >= 0
+        if stopped.any():
+            next_ruler[walkers[stopped]] = reached[stopped]
+            lengths[walkers[stopped]] = walked
+            walking = ~stopped
+            walkers = walkers[walking]
+            current = current[walking]
+        owners[current] = walkers
+        offsets[current] = walked
+        current = following[current]
+        walked += 1
+
+    # Follow the rulers from the head all the way round the list.
+    ruler_positions = np.full(len(rulers), -1, dtype=np.int64)
+    head_ruler = ruler = int(ruler_of[head])
+    position = 0
+    next_rulers = next_ruler.tolist()
+    ruler_lengths = lengths.tolist()
+    while True:
+        ruler_positions[ruler] = position
+        position += ruler_lengths[ruler]
+        ruler = next_rulers[ruler]
+        if ruler == head_ruler:
+            break
+        if ruler_positions[ruler] >= 0:
+            return None
+    if position != items or np.any(owners < 0):
+        return None
+
+    return ruler_positions[owners] + offsets
+
+
+def _breadth_first_distances(opens: np.ndarray, width: int, start: int) -> np.ndarray:
+    """
+    returns the length of the shortest path from the start cell to every
+    cell with a breadth-first search that expands a whole level at a time.
+    """
+    distances = np.full(len(opens), -1, dtype=np.int64)
+    distances[start] = 0
+    offsets = _offsets(width)
+    frontier = np.array([start])
+    level = 0
+    while len(frontier) > 0:
+        level += 1
+        reached = []
+        for direction in range(4):
+            cells = frontier[opens[frontier, direction]] + offsets[direction]
+            reached.append(cells[distances[cells] == -1])
+        frontier = np.unique(np.concatenate(reached))
+        distances[frontier] = level
+    return distances
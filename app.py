@@ -1,7 +1,9 @@
 from tkinter import ttk, Tk, StringVar, BooleanVar
+from typing import Generator
 from maze import Maze
 from solver import Solver
 from graphics import Graphics
+from scheduler import Scheduler
 
 
 class App(Tk):
@@ -44,9 +46,26 @@ class App(Tk):
 
         self.solver = Solver(self.maze)
 
+        # The scheduler animates the maze from Tk's event loop so that the
+        # window stays responsive while the maze is generated and solved.
+        self.scheduler = Scheduler(self, fps=30, steps_per_frame=1)
+        self.pause_text = StringVar(value="Pause")
+
+        self.generation_algorithms = {
+            "Recursive Backtracker": "recursive-backtracker",
+            "Kruskal's Algorithm": "kruskal",
+            "Prim's Algorithm": "prim",
+            "Wilson's Algorithm": "wilson",
+            "Eller's Algorithm": "eller",
+            "Binary Tree": "binary-tree",
+            "Sidewinder": "sidewinder",
+        }
+
         self.search_algorithms = {
-            "Breadth-First Search": self.solver.solve_with_bfs_r,
-            "Depth-First Search": self.solver.solve_with_dfs_r,
+            "Breadth-First Search": self.solver.solve_with_bfs,
+            "Depth-First Search": self.solver.solve_with_dfs,
+            "A* Search": self.solver.solve_with_a_star,
+            "Bidirectional Breadth-First Search": self.solver.solve_with_bidirectional_bfs,
         }
 
         self.side_panel = self._create_side_panel()
@@ -57,10 +76,21 @@ class App(Tk):
         label = ttk.Label(frame)
         label.config(text="Maze Solver", font=(None, 20))
         label.pack()
+        tuple_of_generators = tuple(self.generation_algorithms.keys())
+        generator = StringVar()
+        generator.set(tuple_of_generators[0])
+        generator_label = ttk.Label(frame, text="Generation algorithm:")
+        generator_label.pack()
+        generator_combobox = ttk.Combobox(frame, textvariable=generator)
+        generator_combobox["values"] = tuple_of_generators
+        generator_combobox["state"] = "readonly"
+        generator_combobox.pack()
         generate = ttk.Button(
             frame,
             text="Generate maze",
-            command=self.maze.generate,
+            command=lambda: self._run(self.maze.generate_steps(
+                algorithm=self.generation_algorithms[generator.get()],
+            )),
         )
         generate.pack()
         tuple_of_algorithms = tuple(self.search_algorithms.keys())
@@ -81,13 +111,73 @@ class App(Tk):
             offvalue=False,
         )
         enable_randomness.pack()
+        animation = BooleanVar(value=True)
+        enable_animation = ttk.Checkbutton(frame)
+        enable_animation.config(
+            text="Enable Animation",
+            variable=animation,
+            onvalue=True,
+            offvalue=False,
+            command=lambda: self.maze.set_animate(animation.get()),
+        )
+        enable_animation.pack()
         solve = ttk.Button(
             frame,
             text="Solve the maze",
-            command=lambda: self.solver.solve(
+            command=lambda: self._run(self.solver.solve_steps(
                 solve_method=self.search_algorithms[algorithm.get()],
                 enable_random_direction=randomness.get(),
-            ),
+            )),
         )
         solve.pack()
+        speed_label = ttk.Label(frame, text="Speed:")
+        speed_label.pack()
+        speed = ttk.Scale(
+            frame,
+            from_=1,
+            to=50,
+            value=1,
+            command=lambda value: self.scheduler.set_steps_per_frame(
+                round(float(value)),
+            ),
+        )
+        speed.pack()
+        pause = ttk.Button(
+            frame,
+            textvariable=self.pause_text,
+            command=self._toggle_pause,
+        )
+        pause.pack()
+        cancel = ttk.Button(
+            frame,
+            text="Cancel",
+            command=self._cancel,
+        )
+        cancel.pack()
         return frame
+
+    def _run(self, steps: Generator) -> None:
+        """
+        starts animating the step generator, replacing the one that is
+        currently running.
+        """
+        self.pause_text.set("Pause")
+        self.scheduler.start(steps, on_step=self.maze.draw_step)
+
+    def _toggle_pause(self) -> None:
+        """
+        pauses or resumes the running animation.
+        """
+        if self.scheduler.is_paused():
+            self.scheduler.resume()
+            self.pause_text.set("Pause")
+        elif self.scheduler.is_running():
+            self.scheduler.pause()
+            self.pause_text.set("Resume")
+
+    def _cancel(self) -> None:
+        """
+        cancels the running animation.
+        """
+        self.scheduler.cancel()
+        self.pause_text.set("Pause")
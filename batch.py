@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List
+from maze import Maze
+from generators import DEFAULT_GENERATOR, GENERATORS
+from solver import SOLVERS, Solver
+from cli import maze_size, positive_int
+
+
+class Job:
+    """
+    Job describes a maze to generate and solve.
+    """
+
+    def __init__(
+            self,
+            height: int,
+            width: int,
+            generator: str = DEFAULT_GENERATOR,
+            solver: str = "bfs",
+            seed=None,
+    ) -> None:
+        if height < 1 or width < 1:
+            raise ValueError(f"The size of the maze must be at least 1x1, not {height}x{width}.")
+        if generator not in GENERATORS:
+            raise ValueError(f"This is an unknown maze generator ({generator})")
+        if solver not in SOLVERS:
+            raise ValueError(f"This is an unknown maze solver ({solver})")
+        self.height = height
+        self.width = width
+        self.generator = generator
+        self.solver = solver
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        """
+        returns the job as a dictionary which can be encoded as JSON.
+        """
+        return {
+            "height": self.height,
+            "width": self.width,
+            "generator": self.generator,
+            "solver": self.solver,
+            "seed": self.seed,
+        }
+
+
+class JobResult:
+    """
+    JobResult is the outcome of a job. The times are in seconds.
+    """
+
+    def __init__(
+            self,
+            job: Job,
+            path_length: int,
+            cells_visited: int,
+            max_frontier: int,
+            backtracks: int,
+            generate_time: float,
+            solve_time: float,
+    ) -> None:
+        self.job = job
+        self.path_length = path_length
+        self.cells_visited = cells_visited
+        self.max_frontier = max_frontier
+        self.backtracks = backtracks
+        self.generate_time = generate_time
+        self.solve_time = solve_time
+
+    def to_dict(self) -> dict:
+        """
+        returns the result as a dictionary which can be encoded as JSON.
+        """
+        result = self.job.to_dict()
+        result.update({
+            "path_length": self.path_length,
+            "cells_visited": self.cells_visited,
+            "max_frontier": self.max_frontier,
+            "backtracks": self.backtracks,
+            "generate_time": self.generate_time,
+            "solve_time": self.solve_time,
+        })
+        return result
+
+
+def run_job(job: Job) -> JobResult:
+    """
+    generates and solves the maze described by the job.
+    """
+    m = Maze(
+        x_position=0,
+        y_position=0,
+        height=job.height,
+        width=job.width,
+        cell_height=2,
+        cell_width=2,
+        graphics=None,
+        seed=job.seed,
+    )
+    start = time.perf_counter()
+    m.generate(job.generator)
+    generate_time = time.perf_counter() - start
+
+    s = Solver(m, seed=job.seed)
+    result = s.solve(s.get_solve_method(job.solver))
+
+    return JobResult(
+        job=job,
+        path_length=result.path_length,
+        cells_visited=result.cells_visited,
+        max_frontier=result.max_frontier,
+        backtracks=result.backtracks,
+        generate_time=generate_time,
+        solve_time=result.elapsed,
+    )
+
+
+def _run_chunk(jobs: List[Job]) -> List[JobResult]:
+    """
+    runs a chunk of jobs in a worker process.
+    """
+    return [run_job(job) for job in jobs]
+
+
+def run_batch(
+        jobs: Iterable[Job],
+        workers: int = None,
+        chunk_size: int = None,
+) -> Iterator[JobResult]:
+    """
+    runs the jobs across a pool of worker processes and yields each result
+    as soon as its chunk of jobs has finished, so the results are not in
+    the same order as the jobs.
+
+    The jobs are sent to the workers in chunks to cut down on the cost of
+    passing them between processes. By default there is one worker per CPU
+    and each worker gets about four chunks, so that the work stays evenly
+    spread when some mazes take longer than others.
+    """
+    jobs = list(jobs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"The number of workers must be at least 1, not {workers}.")
+    if chunk_size is None:
+        chunk_size = max(1, len(jobs) // (workers * 4))
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size must be at least 1, not {chunk_size}.")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {
+            executor.submit(_run_chunk, jobs[start:start + chunk_size])
+            for start in range(0, len(jobs), chunk_size)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def read_jobs(lines: Iterable[str]) -> Iterator[Job]:
+    """
+    reads a job from each line of JSON, skipping the blank lines. Each line
+    is an object with the same keys as Job.to_dict().
+    """
+    for line in lines:
+        if line.strip():
+            yield Job(**json.loads(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generates and solves a batch of mazes across a pool of worker processes. "
+        "Each result is printed as a line of JSON as soon as it is ready.",
+    )
+    parser.add_argument(
+        "jobs",
+        nargs="?",
+        help="a file with a job on each line as JSON, or - for the standard input. "
+        "Without it --count jobs are made from the options below.",
+    )
+    parser.add_argument("--count", type=positive_int, default=1)
+    parser.add_argument("--height", type=maze_size, default=100)
+    parser.add_argument("--width", type=maze_size, default=100)
+    parser.add_argument("--generator", choices=tuple(GENERATORS.keys()), default=DEFAULT_GENERATOR)
+    parser.add_argument("--solver", choices=tuple(SOLVERS.keys()), default="bfs")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="the seed of the first job, each job after it uses the next seed",
+    )
+    parser.add_argument("--workers", type=positive_int, default=None)
+    parser.add_argument("--chunk-size", type=positive_int, default=None)
+    args = parser.parse_args()
+
+    if args.jobs == "-":
+        jobs = list(read_jobs(sys.stdin))
+    elif args.jobs is not None:
+        with open(args.jobs, encoding="utf-8") as jobs_file:
+            jobs = list(read_jobs(jobs_file))
+    else:
+        jobs = [
+            Job(args.height, args.width, args.generator, args.solver, args.seed + n)
+            for n in range(args.count)
+        ]
+
+    start = time.perf_counter()
+    for result in run_batch(jobs, workers=args.workers, chunk_size=args.chunk_size):
+        print(json.dumps(result.to_dict()), flush=True)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(jobs)} jobs in {elapsed:.3f} s ({len(jobs) / elapsed:.1f} jobs/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,778 @@
+import argparse
+import batch
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from cell import CellWallLabels
+from grid import CellGrid, DIRECTION_STEPS, ENTRY_WALLS, visitor_slot
+from maze import Maze, MazeDirection, MazePosition
+import mazefile
+from generators import DEFAULT_GENERATOR, GENERATORS
+from solver import SOLVERS, Solver
+import stream
+import treeindex
+
+
+def new_maze(args: argparse.Namespace, height: int = None, width: int = None) -> Maze:
+    """
+    returns a new headless maze of the specified size. The size defaults to
+    the height and width given on the command line.
+    """
+
+    return Maze(
+        x_position=0,
+        y_position=0,
+        height=args.height if height is None else height,
+        width=args.width if width is None else width,
+        cell_height=2,
+        cell_width=2,
+        graphics=None,
+        seed=args.seed,
+    )
+
+
+def benchmark_generate(args: argparse.Namespace) -> None:
+    """
+    measures how long it takes to generate a headless maze of the
+    specified size.
+    """
+
+    m = new_maze(args)
+
+    start = time.perf_counter()
+    m.generate()
+    elapsed = time.perf_counter() - start
+
+    cells = args.height * args.width
+    print(f"generate: {args.height}x{args.width} ({cells} cells)")
+    print(f"  total:    {elapsed:.3f} s")
+    print(f"  per cell: {elapsed / cells * 1e6:.3f} us")
+
+
+def benchmark_generators(args: argparse.Namespace) -> None:
+    """
+    measures the throughput of each maze generation algorithm in cells
+    per second.
+    """
+
+    cells = args.height * args.width
+    print(f"generators: {args.height}x{args.width} ({cells} cells)")
+    for algorithm in GENERATORS:
+        m = new_maze(args)
+        start = time.perf_counter()
+        m.generate(algorithm)
+        elapsed = time.perf_counter() - start
+        print(f"  {algorithm}: {elapsed:.3f} s, {cells / elapsed:,.0f} cells/s")
+
+
+def benchmark_solve(args: argparse.Namespace) -> None:
+    """
+    measures how long it takes each solver to solve a headless maze of the
+    specified size.
+    """
+
+    cells = args.height * args.width
+    print(f"solve: {args.height}x{args.width} ({cells} cells)")
+    m = new_maze(args)
+    m.generate()
+    s = Solver(m, seed=args.seed)
+
+    for name in SOLVERS:
+        start = time.perf_counter()
+        result = s.solve(s.get_solve_method(name))
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed:.3f} s, path length {result.path_length}, {result.cells_visited} cells visited, max frontier {result.max_frontier}, {result.backtracks} backtracks")
+
+
+def benchmark_bidirectional(args: argparse.Namespace) -> None:
+    """
+    compares the bidirectional breadth-first search against the
+    breadth-first search on square mazes of each of the specified sizes.
+    """
+
+    for size in args.sizes or [500, 2000]:
+        m = new_maze(args, height=size, width=size)
+        m.generate()
+        s = Solver(m, seed=args.seed)
+
+        print(f"bidirectional: {size}x{size} ({size * size} cells)")
+        for name, solve_method in (
+            ("bfs", s.solve_with_bfs),
+            ("bidirectional-bfs", s.solve_with_bidirectional_bfs),
+        ):
+            start = time.perf_counter()
+            result = s.solve(solve_method)
+            elapsed = time.perf_counter() - start
+            print(f"  {name}: {elapsed:.3f} s, path length {len(result.path)}, {result.cells_visited} cells visited")
+
+
+class StepMemory:
+    """
+    StepMemory measures the memory allocated by each step of a generator or
+    a solver with tracemalloc. Every call to step() adds the peak memory
+    since the previous call on top of the memory that was allocated at the
+    time, so the memory of the short-lived objects that are freed before
+    the step ends is counted too.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self._before = 0
+
+    def __enter__(self) -> 'StepMemory':
+        tracemalloc.start()
+        self._before, _ = tracemalloc.get_traced_memory()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.step()
+        tracemalloc.stop()
+
+    def step(self, *_) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.total += peak - self._before
+        tracemalloc.reset_peak()
+        self._before = current
+
+
+def benchmark_allocations(args: argparse.Namespace) -> None:
+    """
+    measures the memory each generator and each solver allocates per cell
+    with tracemalloc, one step at a time (see StepMemory). The generators
+    yield and the solvers call their hook for every cell so that each
+    step can be measured.
+    """
+
+    cells = args.height * args.width
+    print(f"allocations: {args.height}x{args.width} ({cells} cells)")
+    for name, generator in GENERATORS.items():
+        grid = CellGrid(args.height, args.width)
+        with StepMemory() as memory:
+            for _ in generator(grid, random.Random(args.seed), True):
+                memory.step()
+        print(f"  {name}: {memory.total / cells:.1f} bytes/cell")
+
+    m = new_maze(args)
+    m.generate()
+    s = Solver(m, seed=args.seed)
+    for name in SOLVERS:
+        with StepMemory() as memory:
+            result = s.solve(s.get_solve_method(name), hook=memory.step)
+        print(f"  {name}: {memory.total / result.cells_visited:.1f} bytes/cell visited")
+
+
+def benchmark_steps(args: argparse.Namespace) -> None:
+    """
+    measures the cost of a single step of a search, checking whether a
+    neighbouring cell is open and unvisited and marking it as visited, with
+    the Maze's methods (which check their arguments on every call) and with
+    the integer visitor slots and direction tables used by the solvers.
+    """
+
+    m = new_maze(args)
+    m.generate()
+    cells = args.height * args.width
+    print(f"steps: {args.height}x{args.width} ({cells} cells)")
+    last_i = args.height - 1
+    last_j = args.width - 1
+    m.reset_solution("solver")
+
+    def checked() -> None:
+        for i in range(args.height):
+            for j in range(args.width):
+                for direction, wall in (
+                    (MazeDirection.ABOVE, CellWallLabels.BOTTOM),
+                    (MazeDirection.BELOW, CellWallLabels.TOP),
+                    (MazeDirection.LEFT, CellWallLabels.RIGHT),
+                    (MazeDirection.RIGHT, CellWallLabels.LEFT),
+                ):
+                    position = MazePosition(i, j, last_i, last_j).get_adjacent_position(direction)
+                    if position is None:
+                        continue
+                    if m.cell_was_visited_by(position.i, position.j, "solver") or \
+                            m.cell_wall_exists(position.i, position.j, wall):
+                        continue
+                    m.mark_cell_as_visited(position.i, position.j, "solver")
+
+    def fast() -> None:
+        cell_grid = m.get_cell_grid()
+        walls = cell_grid.walls
+        offsets = cell_grid.offsets
+        slot = visitor_slot("solver")
+        stamps = cell_grid.stamps[slot]
+        epoch = cell_grid.epochs[slot]
+        for i in range(args.height):
+            for j in range(args.width):
+                current = (i * args.width) + j
+                for direction in range(4):
+                    offset_i, offset_j = DIRECTION_STEPS[direction]
+                    adjacent_i = i + offset_i
+                    adjacent_j = j + offset_j
+                    if (adjacent_i < 0) or (adjacent_i > last_i) or (adjacent_j < 0) or (adjacent_j > last_j):
+                        continue
+                    adjacent = current + offsets[direction]
+                    if (stamps[adjacent] == epoch) or (walls[adjacent] & ENTRY_WALLS[direction]):
+                        continue
+                    stamps[adjacent] = epoch
+
+    steps = cells * 4
+    for name, function in (("checked", checked), ("fast", fast)):
+        m.reset_solution("solver")
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {elapsed / steps * 1e9:.0f} ns/step")
+
+    s = Solver(m, seed=args.seed)
+    start = time.perf_counter()
+    result = s.solve(s.solve_with_bfs)
+    elapsed = time.perf_counter() - start
+    print(f"  bfs: {elapsed / result.cells_visited * 1e9:.0f} ns/cell visited")
+
+
+def benchmark_goals(args: argparse.Namespace) -> None:
+    """
+    measures how long it takes to find the nearest of several goals with a
+    single multi-goal breadth-first search, compared to solving the maze
+    once for each goal and keeping the shortest path.
+    """
+
+    m = new_maze(args)
+    m.generate()
+    cells = args.height * args.width
+    print(f"goals: {args.height}x{args.width} ({cells} cells)")
+
+    rng = random.Random(args.seed)
+    s = Solver(m, seed=args.seed)
+    for count in args.goals:
+        goals = [
+            MazePosition(rng.randrange(args.height), rng.randrange(args.width), args.height - 1, args.width - 1)
+            for _ in range(count)
+        ]
+
+        start = time.perf_counter()
+        nearest = s.solve_nearest(goals)
+        nearest_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        shortest = min(
+            s.solve(s.solve_with_bfs, end=goal).path_length
+            for goal in goals
+        )
+        separate_time = time.perf_counter() - start
+        assert shortest == nearest.path_length
+
+        print(
+            f"  {count} goals: nearest {nearest_time:.3f} s, "
+            f"separate {separate_time:.3f} s ({separate_time / nearest_time:.1f}x), "
+            f"path length {nearest.path_length}"
+        )
+
+
+def benchmark_queries(args: argparse.Namespace) -> None:
+    """
+    measures how long it takes to build a TreeIndex for a maze of the
+    specified size, and how long path and distance queries between random
+    cells take with the index compared to a breadth-first search for each
+    query.
+    """
+
+    m = new_maze(args)
+    m.generate()
+    cells = args.height * args.width
+    print(f"queries: {args.height}x{args.width} ({cells} cells), {args.queries} queries")
+
+    start = time.perf_counter()
+    index = treeindex.TreeIndex(m)
+    elapsed = time.perf_counter() - start
+    print(f"  build index: {elapsed:.3f} s")
+
+    rng = random.Random(args.seed)
+    pairs = [
+        (
+            MazePosition(rng.randrange(args.height), rng.randrange(args.width), args.height - 1, args.width - 1),
+            MazePosition(rng.randrange(args.height), rng.randrange(args.width), args.height - 1, args.width - 1),
+        )
+        for _ in range(args.queries)
+    ]
+    start = time.perf_counter()
+    for a, b in pairs:
+        index.distance(a, b)
+    elapsed = time.perf_counter() - start
+    print(f"  distance: {elapsed / len(pairs) * 1e6:.1f} us/query")
+
+    # The paths between random cells can be thousands of cells long, and a
+    # breadth-first search for every query is slower still, so only some of
+    # the queries are measured.
+    paths = pairs[:max(1, args.queries // 100)]
+    start = time.perf_counter()
+    length = 0
+    for a, b in paths:
+        length += len(index.path(a, b))
+    elapsed = time.perf_counter() - start
+    print(
+        f"  path: {elapsed / len(paths) * 1e6:.1f} us/query, "
+        f"{length / len(paths):.0f} positions/path"
+    )
+
+    s = Solver(m, seed=args.seed)
+    searches = pairs[:max(1, args.queries // 1000)]
+    start = time.perf_counter()
+    for a, b in searches:
+        m.reset_solution("solver")
+        m.run_steps(s.solve_with_bfs(a, b))
+    elapsed = time.perf_counter() - start
+    print(f"  bfs: {elapsed / len(searches) * 1e6:.1f} us/query")
+
+
+def benchmark_stream(args: argparse.Namespace) -> None:
+    """
+    measures the throughput of streaming a maze of the specified size
+    with Eller's algorithm. The rows are written to the null device so
+    that only the generation and packing of the rows is measured.
+    """
+
+    cells = args.height * args.width
+    print(f"stream: {args.height}x{args.width} ({cells} cells)")
+    with open(os.devnull, "wb") as output:
+        start = time.perf_counter()
+        written = mazefile.write_rows(
+            stream.eller_maze_rows(args.width, args.height, args.seed),
+            output,
+        )
+        elapsed = time.perf_counter() - start
+    print(f"  {elapsed:.3f} s, {cells / elapsed:,.0f} cells/s, {written} bytes")
+
+
+def benchmark_load(args: argparse.Namespace) -> None:
+    """
+    measures how long it takes to load a streamed maze of the specified
+    size from a maze file, and to solve it straight from the file.
+    """
+
+    cells = args.height * args.width
+    print(f"load: {args.height}x{args.width} ({cells} cells)")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "maze.bin")
+        mazefile.save(
+            path,
+            mazefile.MazeFileHeader(args.height, args.width, "eller", args.seed),
+            stream.eller_maze_rows(args.width, args.height, args.seed),
+        )
+
+        m = new_maze(args)
+        start = time.perf_counter()
+        m.load(path)
+        elapsed = time.perf_counter() - start
+        print(f"  load: {elapsed:.3f} s, {os.path.getsize(path)} bytes")
+
+        s = Solver(m, seed=args.seed)
+        start = time.perf_counter()
+        result = s.solve(s.solve_with_bfs)
+        elapsed = time.perf_counter() - start
+        print(f"  bfs: {elapsed:.3f} s, path length {len(result.path)}, {result.cells_visited} cells visited")
+        m.close()
+
+
+def benchmark_analysis(args: argparse.Namespace) -> None:
+    """
+    measures how long it takes to analyse a streamed maze of the specified
+    size straight from a maze file. It needs NumPy.
+    """
+
+    import analysis
+
+    cells = args.height * args.width
+    print(f"analysis: {args.height}x{args.width} ({cells} cells)")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "maze.bin")
+        mazefile.save(
+            path,
+            mazefile.MazeFileHeader(args.height, args.width, "eller", args.seed),
+            stream.eller_maze_rows(args.width, args.height, args.seed),
+        )
+
+        m = new_maze(args)
+        m.load(path)
+        start = time.perf_counter()
+        maze_statistics = analysis.analyse_maze(m)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  {elapsed:.3f} s, {maze_statistics.dead_ends} dead ends, "
+            f"{maze_statistics.junctions} junctions, "
+            f"{len(maze_statistics.corridor_lengths)} corridors, "
+            f"furthest cell {maze_statistics.distances.max()}"
+        )
+        del maze_statistics
+        m.close()
+
+
+def benchmark_batch(args: argparse.Namespace) -> None:
+    """
+    measures the throughput of running a batch of jobs with one worker
+    process and then with one worker process per CPU.
+    """
+
+    jobs = [
+        batch.Job(args.height, args.width, seed=args.seed + n)
+        for n in range(args.jobs)
+    ]
+    cpus = os.cpu_count() or 1
+    print(f"batch: {args.jobs} jobs of {args.height}x{args.width}, {cpus} CPUs")
+    for workers in sorted({1, cpus}):
+        start = time.perf_counter()
+        for _ in batch.run_batch(jobs, workers=workers):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"  {workers} workers: {elapsed:.3f} s, {args.jobs / elapsed:.1f} jobs/s")
+
+
+def benchmark_import(args: argparse.Namespace) -> None:
+    """
+    measures how long a new Python process takes to import the maze engine
+    on its own, and together with the tkinter graphics. The median of
+    several runs is reported.
+    """
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    print("import:")
+    for name, modules in (
+        ("interpreter only", "sys"),
+        ("engine", "maze, solver"),
+        ("engine and graphics", "maze, solver, graphics"),
+    ):
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", f"import {modules}"],
+                check=True,
+                cwd=directory,
+            )
+            times.append(time.perf_counter() - start)
+        print(f"  {name}: {statistics.median(times) * 1000:.1f} ms")
+
+
+def measure(
+        function: Callable[[], None],
+        memory: bool = True,
+        runs: int = 1,
+) -> Dict[str, float]:
+    """
+    runs the function the specified number of times and returns the
+    shortest time it took. When memory is True the function is run once
+    more under tracemalloc, so that tracing does not slow down the timed
+    runs, to measure the peak memory it used and the memory it left
+    allocated. The retained memory shows leaks but not how much was
+    allocated and freed during the run (see benchmark_allocations).
+    """
+
+    times = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    measurement = {"seconds": min(times)}
+    if not memory:
+        return measurement
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    function()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    measurement["peak_bytes"] = peak
+    measurement["retained_bytes"] = after - before
+    return measurement
+
+
+def new_graphics(height: int, width: int):
+    """
+    returns a new Graphics canvas big enough for a maze of the specified
+    size, or None when there is no display to draw on. tkinter is only
+    imported here so that the other benchmarks run without it.
+    """
+
+    try:
+        from tkinter import Tk, TclError
+        from graphics import Graphics
+    except ImportError:
+        return None
+    try:
+        root = Tk()
+    except TclError:
+        return None
+    graphics = Graphics(root, width=width * 2, height=height * 2, frame_budget=0)
+    graphics.pack()
+    return graphics
+
+
+def benchmark_suite(args: argparse.Namespace) -> None:
+    """
+    measures generating a maze, solving it with each solver and drawing it
+    with Graphics on square mazes of each of the specified sizes. The time
+    per cell, the peak memory and the retained memory are reported for each.
+    Up to the --trace-max size the memory allocated by every step of
+    generating and solving is measured too (see StepMemory), which is too
+    slow for the largest mazes. The results can be saved as JSON and
+    compared against the results of an earlier run to catch regressions.
+    """
+
+    sizes = args.sizes or [10, 100, 500, 1000, 2000]
+    memory = not args.no_memory
+    results: List[Dict] = []
+
+    def record(
+            benchmark: str,
+            name: str,
+            size: int,
+            function: Callable[[], None],
+            steps: Callable[[Callable[..., None]], None] = None,
+    ) -> None:
+        measurement = measure(function, memory, args.runs)
+        if memory and steps is not None and size <= args.trace_max:
+            with StepMemory() as step_memory:
+                steps(step_memory.step)
+            measurement["allocated_bytes"] = step_memory.total
+        cells = size * size
+        result = {
+            "benchmark": benchmark,
+            "name": name,
+            "size": size,
+            "cells": cells,
+            "seconds": measurement["seconds"],
+            "seconds_per_cell": measurement["seconds"] / cells,
+        }
+        result.update(measurement)
+        results.append(result)
+
+        line = f"  {benchmark} {name}: {measurement['seconds']:.3f} s, {result['seconds_per_cell'] * 1e6:.3f} us/cell"
+        if memory:
+            line += f", peak {measurement['peak_bytes'] / 1e6:.1f} MB, {measurement['retained_bytes']} bytes retained"
+        if "allocated_bytes" in measurement:
+            line += f", {measurement['allocated_bytes'] / cells:.1f} bytes/cell allocated"
+        print(line)
+
+    def generate_steps(size: int) -> Callable[[Callable[..., None]], None]:
+        def run(step: Callable[..., None]) -> None:
+            grid = CellGrid(size, size)
+            for _ in GENERATORS[DEFAULT_GENERATOR](grid, random.Random(args.seed), True):
+                step()
+        return run
+
+    def solve_steps(s: Solver, name: str) -> Callable[[Callable[..., None]], None]:
+        def run(step: Callable[..., None]) -> None:
+            s.solve(s.get_solve_method(name), hook=step)
+        return run
+
+    for size in sizes:
+        print(f"suite: {size}x{size} ({size * size} cells)")
+        record(
+            "generate",
+            DEFAULT_GENERATOR,
+            size,
+            lambda: new_maze(args, height=size, width=size).generate(),
+            generate_steps(size),
+        )
+
+        m = new_maze(args, height=size, width=size)
+        m.generate()
+        s = Solver(m, seed=args.seed)
+        for name in SOLVERS:
+            record(
+                "solve",
+                name,
+                size,
+                lambda: s.solve(s.get_solve_method(name)),
+                solve_steps(s, name),
+            )
+
+        if size > args.render_max:
+            continue
+        graphics = new_graphics(size, size)
+        if graphics is None:
+            print("  draw: skipped (there is no display)")
+            continue
+        m = Maze(0, 0, size, size, 2, 2, graphics, args.seed, animate=False)
+        m.generate()
+        drawn = Solver(m, seed=args.seed)
+        path = drawn.solve(drawn.get_solve_method("bfs")).path
+
+        def draw(function: Callable[[], None]) -> Callable[[], None]:
+            def run() -> None:
+                function()
+                graphics.update_idletasks()
+            return run
+
+        record("draw", "walls", size, draw(m._draw_maze))
+        record("draw", "cells", size, draw(m._draw_all_cells))
+        record("draw", "path", size, draw(lambda: m.draw_path(path)))
+        graphics.master.destroy()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare_results(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+# MEMORY_FIELDS are the memory measurements of the suite which are compared
+# against the baseline, alongside the time. MEMORY_SLACK is the number of
+# bytes each of them can grow by before the threshold applies.
+MEMORY_FIELDS = ("peak_bytes", "retained_bytes", "allocated_bytes")
+MEMORY_SLACK = 4096
+
+
+def compare_results(baseline: List[Dict], results: List[Dict], threshold: float) -> bool:
+    """
+    prints how long each result took and how much memory it used compared
+    to the same result in the baseline, and returns True if any of them
+    took more than threshold times as long or used more than threshold
+    times as much memory (see MEMORY_FIELDS). Memory within MEMORY_SLACK
+    bytes of the baseline never counts as a regression, so that a few
+    bytes retained where there were none before are not flagged.
+    """
+
+    def key(result: Dict) -> Tuple[str, str, int]:
+        return (result["benchmark"], result["name"], result["size"])
+
+    previous = {key(result): result for result in baseline}
+    regressed = False
+    print("compare:")
+    for result in results:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        benchmark, name, size = key(result)
+        ratio = result["seconds"] / before["seconds"]
+        flag = ""
+        if ratio > threshold:
+            flag = " REGRESSION"
+            regressed = True
+        line = f"  {benchmark} {name} {size}x{size}: {ratio:.2f}x{flag}"
+
+        for field in MEMORY_FIELDS:
+            if field not in result or field not in before:
+                continue
+            flag = ""
+            if result[field] > (before[field] * threshold) + MEMORY_SLACK:
+                flag = " REGRESSION"
+                regressed = True
+            line += f", {field} {before[field]} -> {result[field]}{flag}"
+        print(line)
+
+    return regressed
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], None]] = {
+    "generate": benchmark_generate,
+    "generators": benchmark_generators,
+    "solve": benchmark_solve,
+    "bidirectional": benchmark_bidirectional,
+    "allocations": benchmark_allocations,
+    "steps": benchmark_steps,
+    "goals": benchmark_goals,
+    "queries": benchmark_queries,
+    "stream": benchmark_stream,
+    "load": benchmark_load,
+    "analysis": benchmark_analysis,
+    "batch": benchmark_batch,
+    "import": benchmark_import,
+    "suite": benchmark_suite,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs the Maze Solver benchmarks.",
+    )
+    parser.add_argument("benchmark", choices=tuple(BENCHMARKS.keys()))
+    parser.add_argument("--height", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=None,
+        help="the sizes of the square mazes used by the benchmarks that compare several sizes "
+        "(500 and 2000 for bidirectional, 10 to 2000 for suite)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=32,
+        help="the number of jobs used by the batch benchmark",
+    )
+    parser.add_argument(
+        "--goals",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16, 64],
+        help="the numbers of goals used by the goals benchmark",
+    )
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=100000,
+        help="the number of queries used by the queries benchmark",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="the number of times the import benchmark is repeated",
+    )
+    parser.add_argument(
+        "--render-max",
+        type=int,
+        default=200,
+        help="the largest size the suite draws with Graphics",
+    )
+    parser.add_argument(
+        "--trace-max",
+        type=int,
+        default=500,
+        help="the largest size for which the suite measures the memory allocated by every step",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip measuring memory with tracemalloc in the suite",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="the number of timed runs of each suite benchmark, the fastest is reported",
+    )
+    parser.add_argument("--save", help="save the suite's results to this JSON file")
+    parser.add_argument(
+        "--compare",
+        help="compare the suite's results with the results saved in this JSON file",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="how many times slower (or more memory) a result can take before it counts as a regression",
+    )
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import time
+from typing import List
+from maze import Maze
+from generators import DEFAULT_GENERATOR, GENERATORS
+from solver import SOLVERS, Solver
+
+
+def maze_size(value: str) -> int:
+    """
+    returns the height or the width of a maze given on the command line,
+    which must be at least 1.
+    """
+    size = int(value)
+    if size < 1:
+        raise argparse.ArgumentTypeError(f"The size of the maze must be at least 1, not {size}.")
+
+    return size
+
+
+def positive_int(value: str) -> int:
+    """
+    returns a count given on the command line, which must be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"The number must be at least 1, not {number}.")
+
+    return number
+
+
+def main(argv: List[str] = None):
+    """
+    generates (or loads) a maze and solves it without a display, then
+    prints the results and the timings. Nothing imported here depends on
+    tkinter.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generates and solves a maze without launching the application.",
+    )
+    parser.add_argument("--height", type=maze_size, default=20)
+    parser.add_argument("--width", type=maze_size, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--generator", choices=tuple(GENERATORS.keys()), default=DEFAULT_GENERATOR)
+    parser.add_argument("--solver", choices=tuple(SOLVERS.keys()), default="bfs")
+    parser.add_argument(
+        "--random-direction",
+        action="store_true",
+        help="let the solver choose its direction at random",
+    )
+    parser.add_argument("--load", help="solve the maze in this maze file instead of generating one")
+    parser.add_argument("--save", help="save the maze to this maze file")
+    parser.add_argument(
+        "--output",
+        help="write the results to this file as JSON instead of printing them",
+    )
+    args = parser.parse_args(argv)
+
+    m = Maze(
+        x_position=0,
+        y_position=0,
+        height=args.height,
+        width=args.width,
+        cell_height=2,
+        cell_width=2,
+        graphics=None,
+        seed=args.seed,
+    )
+
+    start = time.perf_counter()
+    if args.load:
+        m.load(args.load)
+        time_key = "load_time"
+    else:
+        m.generate(args.generator)
+        time_key = "generate_time"
+    elapsed = time.perf_counter() - start
+
+    if args.save:
+        m.save(args.save)
+
+    s = Solver(m, seed=args.seed)
+    result = s.solve(s.get_solve_method(args.solver), args.random_direction)
+
+    results = {
+        "height": m.get_last_i() + 1,
+        "width": m.get_last_j() + 1,
+        "generator": m.get_generator(),
+        "solver": args.solver,
+        "seed": m.get_seed(),
+        "solved": bool(result),
+        "path_length": result.path_length,
+        "cells_visited": result.cells_visited,
+        "max_frontier": result.max_frontier,
+        "backtracks": result.backtracks,
+        time_key: elapsed,
+        "solve_time": result.elapsed,
+    }
+    m.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+        return
+
+    for key, value in results.items():
+        if isinstance(value, float):
+            value = f"{value:.3f} s"
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+from typing import Callable, Dict, Iterator, List
+from cell import CellWallLabels
+from grid import ALL_WALLS, CellGrid, WALL_BITS, visitor_slot
+
+
+# Each maze generation algorithm is a function which knocks down walls in
+# a CellGrid (which starts with all of its walls up) until every cell can be
+# reached from every other cell. The random number generator is anything
+# with the same methods as random.Random.
+#
+# The algorithms are step generators. When emit is True they yield the
+# index of every cell whose walls they change, otherwise they yield nothing.
+GeneratorFunction = Callable[[CellGrid, object, bool], Iterator[int]]
+
+TOP = WALL_BITS[CellWallLabels.TOP]
+BOTTOM = WALL_BITS[CellWallLabels.BOTTOM]
+LEFT = WALL_BITS[CellWallLabels.LEFT]
+RIGHT = WALL_BITS[CellWallLabels.RIGHT]
+
+
+def _carve(grid: CellGrid, a: int, b: int) -> None:
+    """
+    knocks down the wall between two neighbouring cells.
+    """
+    walls = grid.walls
+    if b == a - grid.width:
+        walls[a] &= ~TOP
+        walls[b] &= ~BOTTOM
+    elif b == a + grid.width:
+        walls[a] &= ~BOTTOM
+        walls[b] &= ~TOP
+    elif b == a - 1:
+        walls[a] &= ~LEFT
+        walls[b] &= ~RIGHT
+    else:
+        walls[a] &= ~RIGHT
+        walls[b] &= ~LEFT
+
+
+def recursive_backtracker(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with a randomised depth-first search from the top left
+    cell. The current path is kept on an explicit stack instead of
+    recursing, so the size of the maze is not limited by Python's recursion
+    limit. The mazes have long, winding corridors with few dead ends.
+    """
+    slot = visitor_slot("generator")
+    stamps = grid.stamps[slot]
+    epoch = grid.epochs[slot]
+    stamps[0] = epoch
+    stack: List[int] = [0]
+    offsets = grid.offsets
+
+    # possible_cells is reused by every step so that no list is allocated
+    # for each cell.
+    possible_cells: List[int] = []
+
+    while stack:
+        current = stack[-1]
+        possible_cells.clear()
+        for direction in grid.inside_directions(current):
+            cell = current + offsets[direction]
+            if stamps[cell] != epoch:
+                possible_cells.append(cell)
+
+        if len(possible_cells) == 0:
+            if emit:
+                yield current
+            stack.pop()
+            continue
+
+        next_cell = possible_cells[rng.randrange(len(possible_cells))]
+        _carve(grid, current, next_cell)
+        if emit:
+            yield current
+        stamps[next_cell] = epoch
+        stack.append(next_cell)
+
+
+def kruskal(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with the randomised Kruskal's algorithm. Every inner
+    wall is visited in a random order and knocked down if the cells on
+    either side of it are not yet connected, which is checked with a
+    union-find structure. The mazes have many short dead ends.
+    """
+    width = grid.width
+    cells = len(grid.walls)
+
+    # Each wall is encoded as (index * 2) for the wall to the right of the
+    # cell and (index * 2) + 1 for the wall below it.
+    walls: List[int] = []
+    for index in range(cells):
+        if (index % width) < width - 1:
+            walls.append(index * 2)
+        if index + width < cells:
+            walls.append((index * 2) + 1)
+    rng.shuffle(walls)
+
+    # parents and sizes make up the union-find structure.
+    parents: List[int] = list(range(cells))
+    sizes: List[int] = [1] * cells
+
+    for wall in walls:
+        a = wall >> 1
+        b = a + width if wall & 1 else a + 1
+
+        root_a = a
+        while parents[root_a] != root_a:
+            parents[root_a] = parents[parents[root_a]]
+            root_a = parents[root_a]
+        root_b = b
+        while parents[root_b] != root_b:
+            parents[root_b] = parents[parents[root_b]]
+            root_b = parents[root_b]
+        if root_a == root_b:
+            continue
+
+        if sizes[root_a] < sizes[root_b]:
+            root_a, root_b = root_b, root_a
+        parents[root_b] = root_a
+        sizes[root_a] += sizes[root_b]
+
+        _carve(grid, a, b)
+        if emit:
+            yield a
+            yield b
+
+
+def prim(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with the randomised Prim's algorithm. The maze grows
+    from a random cell by repeatedly connecting a random cell on its
+    frontier to one of the neighbouring cells already in the maze. The
+    mazes have many short dead ends.
+    """
+    outside = 0
+    frontier = 1
+    inside = 2
+    states = bytearray(len(grid.walls))
+    offsets = grid.offsets
+
+    start = rng.randrange(len(grid.walls))
+    states[start] = inside
+    frontier_cells: List[int] = []
+    for direction in grid.inside_directions(start):
+        cell = start + offsets[direction]
+        states[cell] = frontier
+        frontier_cells.append(cell)
+
+    # inside_cells is reused by every step so that no list is allocated for
+    # each cell.
+    inside_cells: List[int] = []
+
+    while frontier_cells:
+        # Swap the chosen cell with the last one so that it can be removed
+        # from the frontier in constant time.
+        position = rng.randrange(len(frontier_cells))
+        current = frontier_cells[position]
+        frontier_cells[position] = frontier_cells[-1]
+        frontier_cells.pop()
+
+        directions = grid.inside_directions(current)
+        inside_cells.clear()
+        for direction in directions:
+            cell = current + offsets[direction]
+            if states[cell] == inside:
+                inside_cells.append(cell)
+        next_cell = inside_cells[rng.randrange(len(inside_cells))]
+        _carve(grid, current, next_cell)
+        states[current] = inside
+        if emit:
+            yield current
+            yield next_cell
+
+        for direction in directions:
+            cell = current + offsets[direction]
+            if states[cell] == outside:
+                states[cell] = frontier
+                frontier_cells.append(cell)
+
+
+def wilson(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with Wilson's algorithm. Starting from each cell that
+    is not yet in the maze a random walk is taken until it reaches the maze,
+    and the walk (with its loops erased) is then added to the maze. Every
+    possible maze is equally likely to be generated, but the first walks on
+    a large grid can take a long time.
+    """
+    cells = len(grid.walls)
+    in_maze = bytearray(cells)
+    in_maze[rng.randrange(cells)] = 1
+
+    # next_cells records the direction the walk last left each cell in.
+    # Following it from the start of the walk erases any loops.
+    next_cells: List[int] = [-1] * cells
+    offsets = grid.offsets
+
+    for start in range(cells):
+        if in_maze[start]:
+            continue
+
+        current = start
+        while not in_maze[current]:
+            directions = grid.inside_directions(current)
+            direction = directions[rng.randrange(len(directions))]
+            next_cells[current] = current + offsets[direction]
+            current = next_cells[current]
+
+        current = start
+        while not in_maze[current]:
+            in_maze[current] = 1
+            _carve(grid, current, next_cells[current])
+            if emit:
+                yield current
+                yield next_cells[current]
+            current = next_cells[current]
+
+
+def eller_rows(width: int, height: int, rng) -> Iterator[bytearray]:
+    """
+    generates a maze with Eller's algorithm and yields the walls of each
+    row as a bytearray of wall bitmasks (one per cell), as soon as the row
+    is complete. Only the current row is held in memory so the height of
+    the maze is unlimited.
+    """
+    # sets records which set each cell in the current row belongs to. Cells
+    # in the same set are connected by the rows generated so far.
+    sets: List[int] = [0] * width
+    next_set = 1
+    open_above = bytearray(width)
+
+    for i in range(height):
+        last_row = i == height - 1
+        row = bytearray([ALL_WALLS]) * width
+        members: Dict[int, List[int]] = {}
+        for j in range(width):
+            if open_above[j]:
+                row[j] &= ~TOP
+            else:
+                sets[j] = next_set
+                next_set += 1
+            members.setdefault(sets[j], []).append(j)
+
+        # Randomly join neighbouring cells in different sets. In the last
+        # row all of them are joined so that the maze is connected.
+        for j in range(width - 1):
+            if sets[j] == sets[j + 1]:
+                continue
+            if not last_row and rng.random() < 0.5:
+                continue
+            row[j] &= ~RIGHT
+            row[j + 1] &= ~LEFT
+            keep = sets[j]
+            merge = sets[j + 1]
+            if len(members[keep]) < len(members[merge]):
+                keep, merge = merge, keep
+            for column in members[merge]:
+                sets[column] = keep
+            members[keep].extend(members.pop(merge))
+
+        # Randomly open at least one cell in each set to the row below.
+        open_above = bytearray(width)
+        if not last_row:
+            for columns in members.values():
+                opened = False
+                for column in columns:
+                    if rng.random() < 0.5:
+                        open_above[column] = 1
+                        opened = True
+                if not opened:
+                    open_above[rng.choice(columns)] = 1
+            for j in range(width):
+                if open_above[j]:
+                    row[j] &= ~BOTTOM
+
+        yield row
+
+
+def eller(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with Eller's algorithm one row at a time (see
+    eller_rows). Only the walls that are knocked down are copied into the
+    grid so that any walls that were already opened stay open.
+    """
+    width = grid.width
+    walls = grid.walls
+    for i, row in enumerate(eller_rows(width, grid.height, rng)):
+        offset = i * width
+        for j in range(width):
+            if (walls[offset + j] & row[j]) == walls[offset + j]:
+                continue
+            walls[offset + j] &= row[j]
+            if emit:
+                yield offset + j
+
+
+def binary_tree(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with the binary tree algorithm. Each cell is randomly
+    connected to the cell above it or the cell to its left. It needs no
+    memory apart from the grid, but the top row and the left column are
+    always long straight corridors.
+    """
+    width = grid.width
+    for index in range(len(grid.walls)):
+        above = index >= width
+        left = (index % width) > 0
+        if above and left:
+            next_cell = index - width if rng.random() < 0.5 else index - 1
+        elif above:
+            next_cell = index - width
+        elif left:
+            next_cell = index - 1
+        else:
+            continue
+        _carve(grid, index, next_cell)
+        if emit:
+            yield index
+            yield next_cell
+
+
+def sidewinder(grid: CellGrid, rng, emit: bool) -> Iterator[int]:
+    """
+    generates a maze with the sidewinder algorithm. Each row is split into
+    random runs of cells joined from left to right, and each run is joined
+    to the row above through a random cell in the run. The top row is always
+    a long straight corridor.
+    """
+    width = grid.width
+    for i in range(grid.height):
+        run_start = 0
+        for j in range(width):
+            index = (i * width) + j
+            at_right = j == width - 1
+            if i == 0 or (not at_right and rng.random() < 0.5):
+                if at_right:
+                    continue
+                _carve(grid, index, index + 1)
+                if emit:
+                    yield index
+                    yield index + 1
+                continue
+
+            cell = (i * width) + rng.randint(run_start, j)
+            _carve(grid, cell, cell - width)
+            if emit:
+                yield cell
+                yield cell - width
+            run_start = j + 1
+
+
+# GENERATORS maps the name of each maze generation algorithm to the function
+# that runs it.
+GENERATORS: Dict[str, GeneratorFunction] = {
+    "recursive-backtracker": recursive_backtracker,
+    "kruskal": kruskal,
+    "prim": prim,
+    "wilson": wilson,
+    "eller": eller,
+    "binary-tree": binary_tree,
+    "sidewinder": sidewinder,
+}
+
+DEFAULT_GENERATOR = "recursive-backtracker"
@@ -1,12 +1,24 @@
-from typing import Dict, Tuple
-from time import sleep
+from typing import Dict, List, Tuple
+from time import perf_counter, sleep
 from tkinter import Canvas
 from line import Line, Point
 from cell import CellWallLabels, CellWall
+from renderer import Renderer
 
 
-class Graphics(Canvas):
-    def __init__(self, container, background="white", width=800, height=800) -> None:
+class Graphics(Canvas, Renderer):
+    """
+    Graphics draws the maze onto a tkinter canvas.
+    """
+
+    def __init__(
+            self,
+            container,
+            background="white",
+            width=800,
+            height=800,
+            frame_budget: float = 0.05,
+    ) -> None:
         super().__init__(container)
         self.config(
             bg=background,
@@ -16,13 +28,35 @@ class Graphics(Canvas):
         self._path_tag = "path"
         self._cell_wall_tag = "cell_wall"
 
-    def _redraw(self) -> None:
+        # This is a dictionary mapping the ID of each cell wall to the
+        # canvas item that draws it, so that each wall is only created once.
+        self._wall_items: Dict[int, int] = {}
+        self._frame_budget = frame_budget
+        self._last_frame = perf_counter()
+
+    def set_frame_budget(self, frame_budget: float) -> None:
+        """
+        sets the minimum amount of time (in seconds) that each frame is
+        shown for.
+        """
+        self._frame_budget = frame_budget
+
+    def refresh(self) -> None:
         """
-        redraw redraws all the graphics in the window.
+        refresh redraws all the graphics in the window. It then waits for
+        whatever is left of the frame budget, so the time spent drawing the
+        frame counts towards the budget.
+
+        The drawing methods do not refresh the window themselves. Whatever
+        is driving the drawing refreshes it once per frame, or leaves it to
+        Tk's event loop when it is driven by Tk.after().
         """
         self.update_idletasks()
         self.update()
-        sleep(0.05)
+        remaining = self._frame_budget - (perf_counter() - self._last_frame)
+        if remaining > 0:
+            sleep(remaining)
+        self._last_frame = perf_counter()
 
     def _draw_line(
             self,
@@ -42,17 +76,46 @@ class Graphics(Canvas):
             tags=tags,
         )
 
-    def draw_cell_walls(self, walls: Dict[CellWallLabels, CellWall]) -> None:
+    def draw_cell_walls(
+            self,
+            wall_ids: Dict[CellWallLabels, int],
+            walls: Dict[CellWallLabels, CellWall],
+    ) -> None:
         """
-        draws the walls of a cell onto the canvas.
+        draws the walls of a cell onto the canvas. The canvas item for each
+        wall is created the first time the wall is drawn and is then reused,
+        so it is shown or hidden when the wall is built or destroyed
+        instead of being drawn over.
+
+        If there are no cell wall items yet the walls may have been drawn
+        in a single pass (see draw_walls), so those lines are deleted first.
         """
+        if not self._wall_items:
+            self.delete(self._cell_wall_tag)
         for label in CellWallLabels:
-            self._draw_line(
-                line=walls[label].get_line(),
-                fill_colour=walls[label].get_line_colour(),
+            state = "normal" if walls[label].wall_up() else "hidden"
+            item = self._wall_items.get(wall_ids[label])
+            if item is not None:
+                self.itemconfigure(item, state=state)
+                continue
+            line = walls[label].get_line()
+            self._wall_items[wall_ids[label]] = self.create_line(
+                line.point_a.x, line.point_a.y,
+                line.point_b.x, line.point_b.y,
+                fill="black",
+                width=2,
+                state=state,
                 tags=(self._cell_wall_tag),
             )
-        self._redraw()
+
+    def draw_walls(self, lines: List[Line]) -> None:
+        """
+        replaces all the walls on the canvas with the given wall lines.
+        """
+        self.delete(self._cell_wall_tag)
+        self._wall_items.clear()
+        for line in lines:
+            self._draw_line(line=line, tags=(self._cell_wall_tag))
 
     def draw_path(
             self,
@@ -73,13 +136,31 @@ class Graphics(Canvas):
             fill_colour=fill_colour,
             tags=(self._path_tag),
         )
-        self._redraw()
+
+    def draw_path_through(self, points: List[Point], undo: bool = False) -> None:
+        """
+        draws a path through all of the given points as a single line.
+        """
+        coordinates: List[float] = []
+        for point in points:
+            coordinates.append(point.x)
+            coordinates.append(point.y)
+        fill_colour = "red"
+        if undo:
+            fill_colour = "grey"
+        self.create_line(
+            *coordinates,
+            fill=fill_colour,
+            width=2,
+            tags=(self._path_tag),
+        )
 
     def clear_all(self) -> None:
         """
         clears the canvas
         """
         self.delete("all")
+        self._wall_items.clear()
 
     def clear_paths(self) -> None:
         """
@@ -0,0 +1,246 @@
+from array import array
+from typing import Dict, List, Tuple
+from cell import CellWallLabels
+
+
+# WALL_BITS maps each cell wall to the bit that represents it in a cell's
+# wall bitmask.
+WALL_BITS: Dict[CellWallLabels, int] = {
+    CellWallLabels.TOP: 1 << CellWallLabels.TOP.value,
+    CellWallLabels.BOTTOM: 1 << CellWallLabels.BOTTOM.value,
+    CellWallLabels.LEFT: 1 << CellWallLabels.LEFT.value,
+    CellWallLabels.RIGHT: 1 << CellWallLabels.RIGHT.value,
+}
+
+# ALL_WALLS is the bitmask of a cell with all four of its walls up.
+ALL_WALLS = 0b1111
+
+# VISITORS are the visitors that can mark the cells as visited. The slot of
+# a visitor is its position in VISITORS (see visitor_slot).
+VISITORS = ("generator", "solver")
+
+# The directions are numbered by the values of maze.MazeDirection: above,
+# below, left and right. DIRECTION_STEPS holds the change in the (i, j)
+# position when moving in each direction, and ENTRY_WALLS holds the bit of
+# the wall of the neighbouring cell which blocks the way into it.
+DIRECTION_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+ENTRY_WALLS = (
+    WALL_BITS[CellWallLabels.BOTTOM],
+    WALL_BITS[CellWallLabels.TOP],
+    WALL_BITS[CellWallLabels.RIGHT],
+    WALL_BITS[CellWallLabels.LEFT],
+)
+
+# INSIDE_DIRECTIONS[edges] is the tuple of directions in which a cell has
+# a neighbour on the grid, where bit d of edges is set if the cell is on
+# the edge of the grid in direction d. The tuples are shared so looking up
+# the neighbours of a cell allocates nothing.
+INSIDE_DIRECTIONS = tuple(
+    tuple(direction for direction in range(4) if not edges & (1 << direction))
+    for edges in range(16)
+)
+
+# The visited stamps are 16-bit so the stamps of every visitor wrap around
+# after MAX_EPOCH resets (see CellGrid).
+MAX_EPOCH = 0xFFFF
+
+
+# Packed rows store the walls of two cells in each byte. The walls of the
+# cell with the even column are stored in the low 4 bits and the walls of
+# the cell with the odd column are stored in the high 4 bits. Each row
+# starts on a new byte.
+_LOW_NIBBLE = bytes(value & 0x0F for value in range(256))
+_HIGH_NIBBLE = bytes(value >> 4 for value in range(256))
+_SHIFT_TO_HIGH_NIBBLE = bytes((value << 4) & 0xFF for value in range(256))
+
+
+def visitor_slot(visitor: str) -> int:
+    """
+    returns the slot of the specified visitor, which indexes its stamps
+    and its epoch on a CellGrid.
+    """
+    if visitor not in VISITORS:
+        raise ValueError(f"This is an unknown visitor ({visitor})")
+
+    return VISITORS.index(visitor)
+
+
+def packed_row_size(width: int) -> int:
+    """
+    returns the number of bytes used by a packed row of the specified
+    width.
+    """
+    return (width + 1) // 2
+
+
+def pack_row(row: bytes) -> bytes:
+    """
+    packs a row of wall bitmasks (one per cell) into half as many bytes.
+    """
+    low = row[0::2]
+    high = row[1::2].translate(_SHIFT_TO_HIGH_NIBBLE)
+    size = len(low)
+
+    # The low and high halves never share a bit so adding them as big
+    # integers combines them without looping over each byte in Python.
+    packed = int.from_bytes(low, "little") + int.from_bytes(high, "little")
+    return packed.to_bytes(size, "little")
+
+
+def unpack_row(data: bytes, width: int) -> bytearray:
+    """
+    unpacks a packed row back into a row of wall bitmasks (one per cell).
+    """
+    row = bytearray(len(data) * 2)
+    row[0::2] = data.translate(_LOW_NIBBLE)
+    row[1::2] = data.translate(_HIGH_NIBBLE)
+    del row[width:]
+
+    return row
+
+
+class CellGrid:
+    """
+    CellGrid stores the state of every cell on the maze in flat arrays
+    instead of one object per cell. A cell is identified by its index
+    on the grid which is calculated as (i * width) + j.
+
+    The walls of each cell are stored as a 4-bit bitmask (see WALL_BITS).
+
+    Each visitor (see VISITORS) has an array of stamps with one for every
+    cell, and an epoch which counts how many times its marks were cleared.
+    A cell is visited by the visitor if its stamp equals the current epoch,
+    so clearing every mark only takes a new epoch instead of a pass over
+    the whole grid. The stamps are only cleared when the epoch wraps
+    around.
+
+    The methods which take a visitor's name check it on every call. The
+    generators and the solvers look up the visitor's slot once instead
+    (see visitor_slot) and then use was_visited and mark_visited, or the
+    stamps and the epoch of the slot directly. offsets holds the change in
+    the index of a cell when moving in each direction (see
+    DIRECTION_STEPS).
+
+    The walls can also be any read-only sequence of wall bitmasks, such as
+    the walls of a maze file mapped into memory (see mazefile.PackedWalls).
+    The walls are replaced with a new byte array when the grid is reset.
+    """
+
+    def __init__(self, height: int, width: int, walls=None) -> None:
+        self.height = height
+        self.width = width
+        if walls is None:
+            walls = bytearray([ALL_WALLS]) * (height * width)
+        self.walls = walls
+        self.offsets = (-width, width, -1, 1)
+        self.stamps: List[array] = [
+            array("H", bytes(2 * height * width)) for _ in VISITORS
+        ]
+        self.epochs: List[int] = [1 for _ in VISITORS]
+
+    def index(self, i: int, j: int) -> int:
+        """
+        returns the index of the cell at the specified position.
+        """
+        return (i * self.width) + j
+
+    def inside_directions(self, index: int) -> Tuple[int, ...]:
+        """
+        returns the directions (see DIRECTION_STEPS) in which the specified
+        cell has a neighbour on the grid, in the order above, below, left
+        and right. The neighbour in a direction is at index +
+        offsets[direction]. The tuples are looked up from
+        INSIDE_DIRECTIONS so nothing is allocated.
+        """
+        width = self.width
+        i = index // width
+        j = index - (i * width)
+
+        return INSIDE_DIRECTIONS[
+            (i == 0)
+            | ((i == self.height - 1) << 1)
+            | ((j == 0) << 2)
+            | ((j == width - 1) << 3)
+        ]
+
+    def wall_exists(self, index: int, wall: CellWallLabels) -> bool:
+        """
+        returns True if the given wall of the specified cell exists,
+        or false otherwise.
+        """
+        if wall not in CellWallLabels:
+            raise TypeError(
+                "The argument does not appear to be a valid cell wall."
+            )
+        return (self.walls[index] & WALL_BITS[wall]) != 0
+
+    def configure_walls(
+            self,
+            index: int,
+            top: bool = None,
+            bottom: bool = None,
+            left: bool = None,
+            right: bool = None,
+    ) -> None:
+        """
+        configures the existence of the specified cell's walls.
+        """
+        walls = self.walls[index]
+        for wall, build in (
+            (CellWallLabels.TOP, top),
+            (CellWallLabels.BOTTOM, bottom),
+            (CellWallLabels.LEFT, left),
+            (CellWallLabels.RIGHT, right),
+        ):
+            if build is None:
+                continue
+            if build:
+                walls |= WALL_BITS[wall]
+            else:
+                walls &= ~WALL_BITS[wall]
+        self.walls[index] = walls
+
+    def was_visited_by(self, index: int, visitor: str) -> bool:
+        """
+        returns True if the specified cell was visited by the
+        specified visitor.
+        """
+        return self.was_visited(index, visitor_slot(visitor))
+
+    def mark_as_visited_by(self, index: int, visitor: str) -> None:
+        """
+        marks the specified cell as visited by the specified visitor.
+        """
+        self.mark_visited(index, visitor_slot(visitor))
+
+    def was_visited(self, index: int, slot: int) -> bool:
+        """
+        returns True if the specified cell was visited by the visitor in
+        the specified slot. The slot is not checked.
+        """
+        return self.stamps[slot][index] == self.epochs[slot]
+
+    def mark_visited(self, index: int, slot: int) -> None:
+        """
+        marks the specified cell as visited by the visitor in the specified
+        slot. The slot is not checked.
+        """
+        self.stamps[slot][index] = self.epochs[slot]
+
+    def unmark_visited(self, visitor: str) -> None:
+        """
+        unmarks every cell as visited by the specified visitor.
+        """
+        slot = visitor_slot(visitor)
+        if self.epochs[slot] == MAX_EPOCH:
+            self.stamps[slot] = array("H", bytes(2 * len(self.stamps[slot])))
+            self.epochs[slot] = 0
+        self.epochs[slot] += 1
+
+    def reset(self) -> None:
+        """
+        builds every wall on the grid and unmarks every cell as visited.
+        """
+        self.walls = bytearray([ALL_WALLS]) * len(self.walls)
+        for visitor in VISITORS:
+            self.unmark_visited(visitor)
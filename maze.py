@@ -1,8 +1,12 @@
-from typing import List
+from typing import Dict, Generator, Iterable, List, Tuple, TypeVar
 import random
 from enum import Enum
-from graphics import Graphics
 from cell import Cell, CellWallLabels
+from grid import CellGrid
+from generators import DEFAULT_GENERATOR, GENERATORS
+import mazefile
+from line import Line, Point
+from renderer import Renderer
 
 
 class MazeDirection(Enum):
@@ -16,9 +20,47 @@ class MazeDirection(Enum):
     RIGHT = 3
 
 
+class StepEventKind(Enum):
+    """
+    StepEventKind represents the kinds of steps taken while generating or
+    solving the maze.
+    """
+    CELL = 0
+    VISIT = 1
+    BACKTRACK = 2
+    EXPLORE = 3
+
+
+class StepEvent:
+    """
+    StepEvent describes a single step taken while generating or solving the
+    maze. The cells are identified by their index on the maze grid.
+
+    - CELL: the walls of cell A have changed.
+    - VISIT: the solver has moved from cell A to cell B.
+    - BACKTRACK: the solver has backed out of cell B to cell A.
+    - EXPLORE: the solver has discovered cell B from cell A.
+    """
+
+    def __init__(self, kind: StepEventKind, a: int, b: int = -1) -> None:
+        self.kind = kind
+        self.a = a
+        self.b = b
+
+
+# StepResult is the type of the value returned by a step generator once it
+# has finished.
+StepResult = TypeVar("StepResult")
+
+
 class MazePosition:
     """
     MazePosition represents a position on the maze grid.
+
+    The generators and the solvers work on the flat indices of the cells
+    (see CellGrid) and only create positions for the paths they return, so
+    MazePosition is used where positions are passed in and out of the maze
+    engine.
     """
 
     def __init__(self, i: int, j: int, last_i: int, last_j: int):
@@ -27,6 +69,20 @@ class MazePosition:
         self.last_i = last_i
         self.last_j = last_j
 
+    @classmethod
+    def from_index(cls, index: int, last_i: int, last_j: int) -> 'MazePosition':
+        """
+        returns the position of the cell at the specified index on a maze
+        whose last row and column are last_i and last_j.
+        """
+        return cls(i=index // (last_j + 1), j=index % (last_j + 1), last_i=last_i, last_j=last_j)
+
+    def get_index(self) -> int:
+        """
+        returns the index of the position's cell, (i * width) + j.
+        """
+        return (self.i * (self.last_j + 1)) + self.j
+
     def __eq__(self, other) -> bool:
         if (self.i == other.i) and (self.j == other.j) and (self.last_i == other.last_i) and (self.last_j == other.last_j):
             return True
@@ -82,6 +138,17 @@ class MazePosition:
 class Maze:
     """
     Maze represents a two-dimensional grid of Cells.
+
+    The state of the cells is kept in a compact CellGrid. The position of
+    a cell on the canvas is only calculated when the cell is drawn.
+
+    When animation is enabled every step of the generator and the solvers
+    is drawn as it happens. Otherwise the finished maze and the solution
+    are each drawn in a single pass.
+
+    The maze is drawn through a Renderer (see renderer.py), such as
+    Graphics. Without one the maze is headless and tkinter is never
+    imported.
     """
 
     def __init__(
@@ -92,8 +159,9 @@ class Maze:
             width: int,
             cell_height: int,
             cell_width: int,
-            graphics: Graphics = None,
+            graphics: Renderer = None,
             seed=None,
+            animate: bool = True,
     ) -> None:
         self._x_position = x_position
         self._y_position = y_position
@@ -102,36 +170,236 @@ class Maze:
         self._cell_height = cell_height
         self._cell_width = cell_width
         self._graphics = graphics
-        self._generator = "generator"
+        self._animate = animate
+        self._seed = seed
+        self._generator: str = None
+
+        # The entrance and the exit are the (i, j) positions of their cells,
+        # or None for the top left and the bottom right corners.
+        self._entrance: Tuple[int, int] = None
+        self._exit: Tuple[int, int] = None
 
-        # initialise the random number generator
-        random.seed(seed)
+        # The maze has its own random number generator so that generating
+        # it is not affected by (and does not affect) any other use of the
+        # random module, such as other mazes generated in other threads.
+        self._random = random.Random(seed)
 
         # Create the Maze's cells
-        self._cell_grid: List[List[Cell]] = None
+        self._cell_grid: CellGrid = None
 
-    def generate(self):
+    def generate(self, algorithm: str = DEFAULT_GENERATOR):
         """
-        randomly generates a new maze.
+        randomly generates a new maze with the specified maze generation
+        algorithm (see generators.GENERATORS).
         """
 
+        self.run_steps(self.generate_steps(algorithm))
+
+    def generate_steps(
+            self,
+            algorithm: str = DEFAULT_GENERATOR,
+    ) -> Generator[StepEvent, None, None]:
+        """
+        returns a step generator which randomly generates a new maze one
+        step at a time with the specified maze generation algorithm. When
+        the maze is animated a StepEvent is yielded for every step,
+        otherwise no events are yielded and the maze is drawn once it has
+        been generated.
+        """
+
+        if algorithm not in GENERATORS:
+            raise ValueError(f"This is an unknown maze generator ({algorithm})")
+
         if self._cell_grid is None:
-            self._cell_grid: List[List[Cell]] = None
             self._create_cell_grid()
         else:
-            self._graphics.clear_all()
+            if self._graphics:
+                self._graphics.clear_paths()
             self._reset_cell_grid()
 
-        if self._graphics:
-            self._draw_cell_grid()
+        if self.is_animated():
+            self._draw_all_cells()
 
+        self._generator = algorithm
         self._open_entrance_and_exit()
-        self._break_walls_r(MazePosition(
-            i=0,
-            j=0,
+        emit = self.is_animated()
+        for index in GENERATORS[algorithm](self._cell_grid, self._random, emit):
+            yield StepEvent(StepEventKind.CELL, index)
+
+        if self._graphics and not self._animate:
+            self._draw_maze()
+
+    def load_rows(self, rows: Iterable[bytes]) -> None:
+        """
+        replaces the maze's walls with the given rows of wall bitmasks
+        (one per cell, see grid.WALL_BITS), such as the rows streamed by
+        mazefile.read_rows. There must be one row for every row of the
+        maze. The rows were not generated by the maze so its generator and
+        seed are cleared.
+        """
+
+        if self._cell_grid is None:
+            self._create_cell_grid()
+        else:
+            if self._graphics:
+                self._graphics.clear_paths()
+            self._reset_cell_grid()
+        self._generator = None
+        self._seed = None
+
+        walls = self._cell_grid.walls
+        count = 0
+        for row in rows:
+            if count == self._height:
+                raise ValueError(f"There are more than {self._height} rows.")
+            if len(row) != self._width:
+                raise ValueError(
+                    f"Row {count} has {len(row)} cells instead of {self._width}."
+                )
+            offset = count * self._width
+            walls[offset:offset + self._width] = row
+            count += 1
+
+        if count != self._height:
+            raise ValueError(f"There are {count} rows instead of {self._height}.")
+
+        if self._graphics:
+            self._draw_maze()
+            self._graphics.refresh()
+
+    def save(self, path: str) -> None:
+        """
+        saves the maze to a maze file (see mazefile), along with the name of
+        the algorithm that generated it and the seed.
+        """
+
+        if self._cell_grid is None:
+            raise ValueError("The maze has not been generated yet.")
+
+        header = mazefile.MazeFileHeader(
+            height=self._height,
+            width=self._width,
+            generator=self._generator or "",
+            seed=self._seed,
+        )
+        walls = self._cell_grid.walls
+        if isinstance(walls, mazefile.PackedWalls):
+            rows = walls.rows()
+        else:
+            rows = (
+                walls[offset:offset + self._width]
+                for offset in range(0, len(walls), self._width)
+            )
+        mazefile.save(path, header, rows)
+
+    def load(self, path: str) -> None:
+        """
+        loads the maze from a maze file, replacing the size of the maze
+        with the size stored in the file. The file is mapped into memory
+        and the walls are read from it as they are needed, so even very
+        large mazes can be loaded and solved straight away. The loaded
+        walls are read-only until the maze is generated again, and the
+        file stays open until the maze is closed (see close).
+        """
+
+        header, walls = mazefile.load(path)
+        self.close()
+        self._height = header.height
+        self._width = header.width
+        self._reset_moved_positions()
+        self._generator = header.generator or None
+        self._seed = header.seed
+        self._cell_grid = CellGrid(
+            height=header.height,
+            width=header.width,
+            walls=walls,
+        )
+
+        if self._graphics:
+            self._graphics.clear_paths()
+            self._draw_maze()
+            self._graphics.refresh()
+
+    def close(self) -> None:
+        """
+        closes the maze file the walls were loaded from (see load), if
+        any. Generating or loading the maze again closes it too.
+        """
+
+        if self._cell_grid is not None and isinstance(
+                self._cell_grid.walls, mazefile.PackedWalls):
+            self._cell_grid.walls.close()
+
+    def run_steps(
+            self,
+            steps: Generator[StepEvent, None, StepResult],
+    ) -> StepResult:
+        """
+        runs the step generator to completion and returns its result. When
+        the maze has graphics each step is drawn as its own frame.
+        """
+
+        while True:
+            try:
+                event = next(steps)
+            except StopIteration as stop:
+                if self._graphics:
+                    self._graphics.refresh()
+                return stop.value
+            self.draw_step(event)
+            self._graphics.refresh()
+
+    def draw_step(self, event: StepEvent) -> None:
+        """
+        draws the step described by the event.
+        """
+
+        if not self._graphics:
+            return
+
+        if event.kind is StepEventKind.CELL:
+            i, j = divmod(event.a, self._width)
+            self._draw_cell(i=i, j=j)
+            return
+
+        a = MazePosition(
+            i=event.a // self._width,
+            j=event.a % self._width,
+            last_i=self._height-1,
+            last_j=self._width-1,
+        )
+        b = MazePosition(
+            i=event.b // self._width,
+            j=event.b % self._width,
             last_i=self._height-1,
             last_j=self._width-1,
-        ))
+        )
+        self._draw_path(a, b, undo=event.kind is not StepEventKind.VISIT)
+
+    def is_headless(self) -> bool:
+        """
+        returns True if the maze has no graphics to draw on. A headless maze
+        does no rendering work at all, so callers can use this to skip
+        preparing anything that would only be drawn.
+        """
+
+        return self._graphics is None
+
+    def is_animated(self) -> bool:
+        """
+        returns True if each step of generating and solving the maze should
+        be drawn as it happens.
+        """
+
+        return (self._graphics is not None) and self._animate
+
+    def set_animate(self, animate: bool) -> None:
+        """
+        enables or disables the animation of generating and solving the
+        maze.
+        """
+
+        self._animate = animate
 
     def get_last_i(self) -> int:
         "returns the last position of the Maze's outer list."
@@ -143,168 +411,261 @@ class Maze:
 
         return self._width-1
 
-    def _create_cell_grid(self) -> None:
+    def get_cell_grid(self) -> CellGrid:
+        "returns the CellGrid holding the state of every cell."
+
+        return self._cell_grid
+
+    def get_walls(self):
         """
-        creates all the cells and draws them.
+        returns the wall bitmasks of every cell (see grid.WALL_BITS), where
+        the cell at (i, j) is at index (i * width) + j.
         """
 
-        self._cell_grid: List[List[Cell]] = [None for i in range(self._height)]
-        cursor_x = self._x_position
-        cursor_y = self._y_position
+        return self._cell_grid.walls
 
-        for i in range(self._height):
-            cells: List[Cell] = [None for j in range(self._width)]
-            for j in range(self._width):
-                cell = Cell(
-                    cursor_x,
-                    cursor_y,
-                    (cursor_x + self._cell_width),
-                    (cursor_y + self._cell_height),
-                )
-                cells[j] = cell
-                if j == self._width - 1:
-                    cursor_x = self._x_position
-                else:
-                    cursor_x += self._cell_width
-            self._cell_grid[i] = cells
-            cursor_y += self._cell_height
+    def set_entrance(self, i: int, j: int) -> None:
+        """
+        moves the entrance to the cell at the specified position. It is
+        opened the next time the maze is generated.
+        """
+
+        self._check_position(i, j)
+        self._entrance = (i, j)
 
-    def _draw_cell_grid(self) -> None:
+    def set_exit(self, i: int, j: int) -> None:
         """
-        draws all the cells on the maze with a short pause between each cell
-        for animation purposes.
+        moves the exit to the cell at the specified position. It is opened
+        the next time the maze is generated.
         """
 
-        for i in range(self._height):
-            for j in range(self._width):
-                self._draw_cell(i=i, j=j)
+        self._check_position(i, j)
+        self._exit = (i, j)
 
-    def _open_entrance_and_exit(self) -> None:
+    def get_entrance(self) -> MazePosition:
+        "returns the position of the maze's entrance."
+
+        i, j = self._entrance or (0, 0)
+        return MazePosition(i=i, j=j, last_i=self._height-1, last_j=self._width-1)
+
+    def get_exit(self) -> MazePosition:
+        "returns the position of the maze's exit."
+
+        i, j = self._exit or (self._height-1, self._width-1)
+        return MazePosition(i=i, j=j, last_i=self._height-1, last_j=self._width-1)
+
+    def _reset_moved_positions(self) -> None:
         """
-        opens the maze's entrance and exit cells by breaking their respective
-        walls. The entrance is located at the top left and the exit is located
-        at the bottom right of the maze.
+        moves the entrance and the exit back to their default positions if
+        they are outside the maze, such as after a smaller maze is loaded.
         """
 
-        self._cell_grid[0][0].configure_walls(top=False)
-        self._cell_grid[self._height-1][self._width -
-                                        1].configure_walls(bottom=False)
+        for position in ("_entrance", "_exit"):
+            moved = getattr(self, position)
+            if moved is not None and not (
+                    0 <= moved[0] < self._height and 0 <= moved[1] < self._width):
+                setattr(self, position, None)
 
-        if self._graphics:
-            self._draw_cell(0, 0)
-            self._draw_cell(
-                i=self._height-1,
-                j=self._width-1
-            )
+    def _check_position(self, i: int, j: int) -> None:
+        """
+        raises a ValueError if the specified position is outside the maze.
+        """
+
+        if not (0 <= i < self._height and 0 <= j < self._width):
+            raise ValueError(f"The position ({i}, {j}) is outside the maze.")
+
+    def get_generator(self) -> str:
+        "returns the name of the algorithm that generated the maze (if any)."
+
+        return self._generator
+
+    def get_seed(self):
+        "returns the seed of the maze's random number generator."
+
+        return self._seed
 
-    def _break_walls_r(self, current_position: MazePosition) -> None:
+    def _create_cell_grid(self) -> None:
         """
-        _break_walls_r generates a random maze by traversing through the
-        cells and randomly knocking down the walls to create the maze's paths.
+        creates the grid of cells.
         """
 
-        self.mark_cell_as_visited(
-            i=current_position.i,
-            j=current_position.j,
-            visitor=self._generator,
-        )
+        self._cell_grid = CellGrid(height=self._height, width=self._width)
 
-        while True:
-            possible_directions: List[MazeDirection] = []
+    def _draw_all_cells(self) -> None:
+        """
+        draws the walls of every cell. The canvas items for the walls are
+        only created the first time, after that the existing items are
+        updated.
+        """
+
+        for i in range(self._height):
+            for j in range(self._width):
+                self._draw_cell(i=i, j=j)
+
+    def _draw_maze(self) -> None:
+        """
+        draws all of the maze's walls in a single pass.
+        """
+
+        self._graphics.draw_walls(self._wall_lines())
+
+    def _wall_lines(self) -> List[Line]:
+        """
+        returns the lines needed to draw all of the maze's walls. Walls that
+        continue from one cell into the next are merged into a single line
+        so that as few lines as possible are drawn.
+        """
 
-            for direction in MazeDirection:
-                adjacent_position = current_position.get_adjacent_position(
-                    direction)
-                if adjacent_position is None:
+        lines: List[Line] = []
+        grid = self._cell_grid
+
+        # The horizontal walls are drawn along the top of each row and the
+        # bottom of the last row.
+        for row in range(self._height + 1):
+            i = min(row, self._height - 1)
+            wall = CellWallLabels.TOP if row < self._height else CellWallLabels.BOTTOM
+            y = self._y_position + (row * self._cell_height)
+            run_start = None
+            for j in range(self._width + 1):
+                if (j < self._width) and grid.wall_exists(grid.index(i, j), wall):
+                    if run_start is None:
+                        run_start = j
                     continue
-                if self.cell_was_visited_by(
-                        i=adjacent_position.i,
-                        j=adjacent_position.j,
-                        visitor=self._generator,
-                ):
+                if run_start is not None:
+                    lines.append(Line(
+                        Point(self._x_position + (run_start * self._cell_width), y),
+                        Point(self._x_position + (j * self._cell_width), y),
+                    ))
+                    run_start = None
+
+        # The vertical walls are drawn along the left of each column and the
+        # right of the last column.
+        for column in range(self._width + 1):
+            j = min(column, self._width - 1)
+            wall = CellWallLabels.LEFT if column < self._width else CellWallLabels.RIGHT
+            x = self._x_position + (column * self._cell_width)
+            run_start = None
+            for i in range(self._height + 1):
+                if (i < self._height) and grid.wall_exists(grid.index(i, j), wall):
+                    if run_start is None:
+                        run_start = i
                     continue
-                possible_directions.append(direction)
+                if run_start is not None:
+                    lines.append(Line(
+                        Point(x, self._y_position + (run_start * self._cell_height)),
+                        Point(x, self._y_position + (i * self._cell_height)),
+                    ))
+                    run_start = None
 
-            if len(possible_directions) == 0:
-                if self._graphics:
-                    self._draw_cell(i=current_position.i, j=current_position.j)
-                break
-
-            chosen_direction = random.choice(possible_directions)
-            next_position = current_position.get_adjacent_position(
-                chosen_direction)
-
-            if chosen_direction is MazeDirection.ABOVE:
-                self._configure_cell_walls(
-                    i=current_position.i,
-                    j=current_position.j,
-                    top=False,
-                )
-                self._configure_cell_walls(
-                    i=next_position.i,
-                    j=next_position.j,
-                    bottom=False,
-                )
-            elif chosen_direction is MazeDirection.BELOW:
-                self._configure_cell_walls(
-                    i=current_position.i,
-                    j=current_position.j,
-                    bottom=False,
-                )
-                self._configure_cell_walls(
-                    i=next_position.i,
-                    j=next_position.j,
-                    top=False,
-                )
-            elif chosen_direction is MazeDirection.LEFT:
-                self._configure_cell_walls(
-                    i=current_position.i,
-                    j=current_position.j,
-                    left=False,
-                )
-                self._configure_cell_walls(
-                    i=next_position.i,
-                    j=next_position.j,
-                    right=False,
-                )
-            elif chosen_direction is MazeDirection.RIGHT:
-                self._configure_cell_walls(
-                    i=current_position.i,
-                    j=current_position.j,
-                    right=False,
-                )
-                self._configure_cell_walls(
-                    i=next_position.i,
-                    j=next_position.j,
-                    left=False,
-                )
+        return lines
 
-            if self._graphics:
-                self._draw_cell(i=current_position.i, j=current_position.j)
+    def _open_entrance_and_exit(self) -> None:
+        """
+        opens the maze's entrance and exit cells by breaking their walls on
+        the edge of the maze. By default the entrance is located at the top
+        left and the exit is located at the bottom right of the maze. An
+        entrance or an exit inside the maze has no wall on the edge to
+        break.
+        """
 
-            self._break_walls_r(next_position)
+        entrance = self.get_entrance()
+        exit_ = self.get_exit()
+        for position, walls in (
+            (entrance, (CellWallLabels.TOP, CellWallLabels.LEFT, CellWallLabels.BOTTOM, CellWallLabels.RIGHT)),
+            (exit_, (CellWallLabels.BOTTOM, CellWallLabels.RIGHT, CellWallLabels.TOP, CellWallLabels.LEFT)),
+        ):
+            on_edge = {
+                CellWallLabels.TOP: position.i == 0,
+                CellWallLabels.BOTTOM: position.i == self._height-1,
+                CellWallLabels.LEFT: position.j == 0,
+                CellWallLabels.RIGHT: position.j == self._width-1,
+            }
+            for wall in walls:
+                if on_edge[wall]:
+                    self._configure_cell_walls(
+                        i=position.i,
+                        j=position.j,
+                        **{wall.name.lower(): False},
+                    )
+                    break
+
+        if self.is_animated():
+            self._draw_cell(entrance.i, entrance.j)
+            self._draw_cell(exit_.i, exit_.j)
 
     def _draw_cell(self, i: int, j: int) -> None:
         """
         draws the cells in an animated way.
         """
 
-        self._graphics.draw_cell_walls(self._cell_grid[i][j].get_walls())
+        self._graphics.draw_cell_walls(
+            self._wall_ids(i=i, j=j),
+            self._cell(i=i, j=j).get_walls(),
+        )
+
+    def _wall_ids(self, i: int, j: int) -> Dict[CellWallLabels, int]:
+        """
+        returns the IDs of the walls of the cell at the specified position.
+        A wall shared by two neighbouring cells has the same ID for both
+        cells. The horizontal walls are numbered row by row first, followed
+        by the vertical walls.
+        """
+
+        vertical = (self._height + 1) * self._width
+        return {
+            CellWallLabels.TOP: (i * self._width) + j,
+            CellWallLabels.BOTTOM: ((i + 1) * self._width) + j,
+            CellWallLabels.LEFT: vertical + (i * (self._width + 1)) + j,
+            CellWallLabels.RIGHT: vertical + (i * (self._width + 1)) + j + 1,
+        }
 
-    def _draw_path(self, current_cell: Cell, next_cell: Cell, undo: bool = False) -> None:
+    def _draw_path(self, a: MazePosition, b: MazePosition, undo: bool = False) -> None:
         """
         draws a path between two cells in an animated way.
         """
 
         self._graphics.draw_path(
-            current_cell.centre(), next_cell.centre(), undo)
+            self._cell_centre(a.i, a.j), self._cell_centre(b.i, b.j), undo)
+
+    def _cell(self, i: int, j: int) -> Cell:
+        """
+        returns a Cell describing the position and the walls of the cell at
+        the specified position on the canvas.
+        """
+
+        x1 = self._x_position + (j * self._cell_width)
+        y1 = self._y_position + (i * self._cell_height)
+        cell = Cell(x1, y1, x1 + self._cell_width, y1 + self._cell_height)
+        index = self._cell_grid.index(i, j)
+        cell.configure_walls(
+            top=self._cell_grid.wall_exists(index, CellWallLabels.TOP),
+            bottom=self._cell_grid.wall_exists(index, CellWallLabels.BOTTOM),
+            left=self._cell_grid.wall_exists(index, CellWallLabels.LEFT),
+            right=self._cell_grid.wall_exists(index, CellWallLabels.RIGHT),
+        )
+
+        return cell
+
+    def _cell_centre(self, i: int, j: int) -> Point:
+        """
+        returns the central point of the cell at the specified position on
+        the canvas.
+        """
+
+        return Point(
+            self._x_position + (j * self._cell_width) + (self._cell_width / 2),
+            self._y_position + (i * self._cell_height) + (self._cell_height / 2),
+        )
 
     def mark_cell_as_visited(self, i: int, j: int, visitor: str) -> None:
         """
         marks the cell at the specified position by the specified visitor.
         """
 
-        self._cell_grid[i][j].mark_as_visited_by(visitor)
+        self._cell_grid.mark_as_visited_by(
+            self._cell_grid.index(i, j),
+            visitor,
+        )
 
     def cell_was_visited_by(self, i: int, j: int, visitor: str) -> bool:
         """
@@ -312,24 +673,40 @@ class Maze:
         the specified visitor.
         """
 
-        return self._cell_grid[i][j].was_visited_by(visitor)
+        return self._cell_grid.was_visited_by(
+            self._cell_grid.index(i, j),
+            visitor,
+        )
 
     def cell_wall_exists(self, i: int, j: int, wall: CellWallLabels) -> bool:
         """
         returns true if a specified cell's wall exists.
         """
 
-        return self._cell_grid[i][j].wall_exists(wall)
+        return self._cell_grid.wall_exists(self._cell_grid.index(i, j), wall)
 
     def draw_path_between(self, a: MazePosition, b: MazePosition, undo: bool = False) -> None:
         """
         draws a path between position A and position B
         """
 
-        cell_a = self._cell_grid[a.i][a.j]
-        cell_b = self._cell_grid[b.i][b.j]
+        if not self._graphics:
+            return
+
+        self._draw_path(a, b, undo)
+
+    def draw_path(self, path: List[MazePosition], undo: bool = False) -> None:
+        """
+        draws a path through each of the positions in a single pass.
+        """
+
+        if not self._graphics or len(path) < 2:
+            return
 
-        self._draw_path(cell_a, cell_b, undo)
+        self._graphics.draw_path_through(
+            [self._cell_centre(position.i, position.j) for position in path],
+            undo,
+        )
 
     def _configure_cell_walls(
         self,
@@ -344,7 +721,8 @@ class Maze:
         (re)configures the walls of the specified cell.
         """
 
-        self._cell_grid[i][j].configure_walls(
+        self._cell_grid.configure_walls(
+            self._cell_grid.index(i, j),
             top=top,
             bottom=bottom,
             left=left,
@@ -352,12 +730,16 @@ class Maze:
         )
 
     def _reset_cell_grid(self) -> None:
-        for i in range(self._height):
-            for j in range(self._width):
-                self._cell_grid[i][j].reset()
+        self.close()
+        self._cell_grid.reset()
 
     def reset_solution(self, visitor: str) -> None:
-        self._graphics.clear_paths()
-        for i in range(self._height):
-            for j in range(self._width):
-                self._cell_grid[i][j].unmark_visited(visitor)
+        """
+        unmarks every cell as visited by the specified visitor and clears
+        the drawn paths. Unmarking the cells takes the same time however
+        large the maze is (see CellGrid).
+        """
+
+        if self._graphics:
+            self._graphics.clear_paths()
+        self._cell_grid.unmark_visited(visitor)
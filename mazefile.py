@@ -0,0 +1,203 @@
+import mmap
+import struct
+from typing import BinaryIO, Iterable, Iterator, Tuple
+from grid import pack_row, packed_row_size, unpack_row
+
+
+# A maze file starts with a header followed by the walls of every row of the
+# maze, packed two cells to a byte (see grid.pack_row). The header is made
+# up of the fixed fields below followed by the name of the algorithm that
+# generated the maze, encoded as UTF-8.
+#
+# The fixed fields are the magic bytes, the version of the format, the
+# flags, the length of the generator's name, the height, the width and the
+# seed.
+_HEADER = struct.Struct("<4sBBHIIq")
+_HAS_SEED = 0b1
+
+MAGIC = b"MAZE"
+VERSION = 1
+
+
+class MazeFileHeader:
+    """
+    MazeFileHeader describes the maze stored in a maze file.
+    """
+
+    def __init__(self, height: int, width: int, generator: str, seed=None) -> None:
+        if not (1 <= height < 2 ** 32 and 1 <= width < 2 ** 32):
+            raise ValueError(
+                f"The size of the maze must be between 1x1 and {2 ** 32 - 1} "
+                f"cells each way, not {height}x{width}."
+            )
+        if seed is not None and (
+                not isinstance(seed, int) or not -(2 ** 63) <= seed < 2 ** 63
+        ):
+            raise ValueError(
+                f"Only seeds which are 64-bit integers can be saved ({seed!r})"
+            )
+        self.height = height
+        self.width = width
+        self.generator = generator
+        self.seed = seed
+
+    def __eq__(self, other) -> bool:
+        return (
+            self.height == other.height
+            and self.width == other.width
+            and self.generator == other.generator
+            and self.seed == other.seed
+        )
+
+
+def write_header(output: BinaryIO, header: MazeFileHeader) -> int:
+    """
+    writes the header to the output and returns the number of bytes
+    written.
+    """
+    name = header.generator.encode("utf-8")
+    flags = _HAS_SEED if header.seed is not None else 0
+    fields = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        flags,
+        len(name),
+        header.height,
+        header.width,
+        header.seed if header.seed is not None else 0,
+    )
+    return output.write(fields) + output.write(name)
+
+
+def read_header(source: BinaryIO) -> MazeFileHeader:
+    """
+    reads the header from the source, leaving it positioned at the start
+    of the walls.
+    """
+    fields = source.read(_HEADER.size)
+    if len(fields) != _HEADER.size:
+        raise ValueError("The maze file is too short to have a header.")
+
+    magic, version, flags, name_length, height, width, seed = _HEADER.unpack(fields)
+    if magic != MAGIC:
+        raise ValueError("This does not appear to be a maze file.")
+    if version != VERSION:
+        raise ValueError(f"This is an unsupported maze file version ({version})")
+
+    name = source.read(name_length)
+    if len(name) != name_length:
+        raise ValueError("The maze file is too short to have a header.")
+
+    return MazeFileHeader(
+        height=height,
+        width=width,
+        generator=name.decode("utf-8"),
+        seed=seed if flags & _HAS_SEED else None,
+    )
+
+
+def write_rows(rows: Iterable[bytes], output: BinaryIO) -> int:
+    """
+    packs each row and writes it to the output, which can be any writable
+    binary stream such as a file or a socket's file object. It returns the
+    number of bytes written.
+    """
+    written = 0
+    for row in rows:
+        written += output.write(pack_row(row))
+
+    return written
+
+
+def read_rows(source: BinaryIO, width: int, height: int) -> Iterator[bytearray]:
+    """
+    reads the packed rows of a maze of the specified size from the source
+    and yields each row unpacked, one row at a time.
+    """
+    size = packed_row_size(width)
+    for i in range(height):
+        data = source.read(size)
+        if len(data) != size:
+            raise ValueError(
+                f"The stream ended at row {i} of {height} rows."
+            )
+        yield unpack_row(data, width)
+
+
+def save(path: str, header: MazeFileHeader, rows: Iterable[bytes]) -> None:
+    """
+    saves a maze file with the given header and rows of wall bitmasks.
+    """
+    with open(path, "wb") as output:
+        write_header(output, header)
+        write_rows(rows, output)
+
+
+class PackedWalls:
+    """
+    PackedWalls is a read-only sequence of the wall bitmasks of every cell,
+    read straight from the packed rows of a maze file as they are needed.
+    It can be used as the walls of a CellGrid so that a maze can be solved
+    without unpacking it into memory first.
+    """
+
+    def __init__(self, buffer, offset: int, height: int, width: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._height = height
+        self._width = width
+        self._row_size = packed_row_size(width)
+
+    def __len__(self) -> int:
+        return self._height * self._width
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self._height * self._width:
+            raise IndexError("The cell index is outside the maze.")
+        i, j = divmod(index, self._width)
+        packed = self._buffer[self._offset + (i * self._row_size) + (j >> 1)]
+        return (packed >> ((j & 1) << 2)) & 0x0F
+
+    def packed(self) -> memoryview:
+        """
+        returns a read-only view of the packed rows, without copying them.
+        """
+        size = self._height * self._row_size
+        return memoryview(self._buffer)[self._offset:self._offset + size]
+
+    def rows(self) -> Iterator[bytearray]:
+        """
+        yields every row of wall bitmasks, one row at a time.
+        """
+        for i in range(self._height):
+            start = self._offset + (i * self._row_size)
+            yield unpack_row(self._buffer[start:start + self._row_size], self._width)
+
+    def close(self) -> None:
+        """
+        closes the underlying memory map.
+        """
+        self._buffer.close()
+
+
+def load(path: str) -> Tuple[MazeFileHeader, PackedWalls]:
+    """
+    maps the maze file into memory and returns its header and its walls.
+    The walls are only read from the file when they are accessed.
+    """
+    with open(path, "rb") as source:
+        buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        header = read_header(buffer)
+        offset = buffer.tell()
+        expected = offset + (header.height * packed_row_size(header.width))
+        if len(buffer) < expected:
+            raise ValueError(
+                f"The maze file is truncated ({len(buffer)} of {expected} bytes)."
+            )
+    except Exception:
+        buffer.close()
+        raise
+
+    return header, PackedWalls(buffer, offset, header.height, header.width)
@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+from line import Line, Point
+from cell import CellWallLabels, CellWall
+
+
+class Renderer(ABC):
+    """
+    Renderer is the interface the maze draws itself through. It has no
+    dependencies on any GUI toolkit so the maze can be used without one.
+    Graphics implements it with a tkinter canvas, and is only imported by
+    the application. Every method is abstract so a renderer which is
+    missing one cannot be created.
+    """
+
+    @abstractmethod
+    def refresh(self) -> None:
+        """
+        shows everything drawn since the last refresh.
+        """
+
+    @abstractmethod
+    def draw_cell_walls(
+            self,
+            wall_ids: Dict[CellWallLabels, int],
+            walls: Dict[CellWallLabels, CellWall],
+    ) -> None:
+        """
+        draws (or updates) the walls of a cell. Each wall is identified by
+        its ID, which is shared by the neighbouring cell on the other side
+        of the wall.
+        """
+
+    @abstractmethod
+    def draw_walls(self, lines: List[Line]) -> None:
+        """
+        replaces all the walls with the given wall lines.
+        """
+
+    @abstractmethod
+    def draw_path(
+            self,
+            from_cell_centre: Point,
+            to_cell_centre: Point,
+            undo: bool = False
+    ) -> None:
+        """
+        draws a path between the centres of two cells.
+        """
+
+    @abstractmethod
+    def draw_path_through(self, points: List[Point], undo: bool = False) -> None:
+        """
+        draws a path through all of the given points.
+        """
+
+    @abstractmethod
+    def clear_all(self) -> None:
+        """
+        clears everything that has been drawn.
+        """
+
+    @abstractmethod
+    def clear_paths(self) -> None:
+        """
+        clears all the paths.
+        """
@@ -0,0 +1,138 @@
+from typing import Any, Callable, Generator
+from time import perf_counter
+
+
+class Scheduler:
+    """
+    Scheduler runs a step generator from Tk's event loop instead of
+    blocking it. Each frame advances the step generator by a number of
+    steps, passes each yielded event to a callback and then uses the
+    widget's after() method to schedule the next frame at the target frame
+    rate. Only one step generator runs at a time.
+    """
+
+    def __init__(self, widget, fps: int = 30, steps_per_frame: int = 1) -> None:
+        self._widget = widget
+        self._fps = fps
+        self._steps_per_frame = steps_per_frame
+        self._steps: Generator = None
+        self._on_step: Callable[[Any], None] = None
+        self._on_done: Callable[[Any], None] = None
+        self._after_id = None
+        self._paused = False
+
+    def start(
+            self,
+            steps: Generator,
+            on_step: Callable[[Any], None],
+            on_done: Callable[[Any], None] = None,
+    ) -> None:
+        """
+        starts running the step generator, cancelling the one that is
+        currently running (if any). on_step is called with every event
+        yielded by the step generator and on_done is called with the value
+        it returns once it has finished.
+        """
+        self.cancel()
+        self._steps = steps
+        self._on_step = on_step
+        self._on_done = on_done
+        self._schedule(0)
+
+    def pause(self) -> None:
+        """
+        pauses the running step generator.
+        """
+        if not self.is_running() or self._paused:
+            return
+        self._paused = True
+        self._cancel_frame()
+
+    def resume(self) -> None:
+        """
+        resumes the paused step generator.
+        """
+        if not self.is_running() or not self._paused:
+            return
+        self._paused = False
+        self._schedule(0)
+
+    def cancel(self) -> None:
+        """
+        stops the running step generator without waiting for it to finish.
+        """
+        self._cancel_frame()
+        if self._steps is not None:
+            self._steps.close()
+        self._clear()
+
+    def is_running(self) -> bool:
+        """
+        returns True if a step generator is running or paused.
+        """
+        return self._steps is not None
+
+    def is_paused(self) -> bool:
+        """
+        returns True if the running step generator is paused.
+        """
+        return self._paused
+
+    def set_fps(self, fps: int) -> None:
+        """
+        sets the target number of frames per second.
+        """
+        self._fps = max(1, fps)
+
+    def set_steps_per_frame(self, steps_per_frame: int) -> None:
+        """
+        sets the number of steps taken in each frame.
+        """
+        self._steps_per_frame = max(1, steps_per_frame)
+
+    def _schedule(self, delay: int) -> None:
+        """
+        schedules the next frame to run after the specified delay
+        (in milliseconds).
+        """
+        self._after_id = self._widget.after(delay, self._run_frame)
+
+    def _cancel_frame(self) -> None:
+        """
+        cancels the next scheduled frame.
+        """
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _clear(self) -> None:
+        self._steps = None
+        self._on_step = None
+        self._on_done = None
+        self._paused = False
+
+    def _run_frame(self) -> None:
+        """
+        advances the step generator by the configured number of steps and
+        schedules the next frame. The time spent on the steps counts towards
+        the frame.
+        """
+        self._after_id = None
+        frame_start = perf_counter()
+
+        try:
+            for _ in range(self._steps_per_frame):
+                event = next(self._steps)
+                self._on_step(event)
+        except StopIteration as stop:
+            on_done = self._on_done
+            self._clear()
+            if on_done is not None:
+                on_done(stop.value)
+            return
+        except Exception:
+            self._clear()
+            raise
+
+        elapsed = (perf_counter() - frame_start) * 1000
+        self._schedule(max(1, int((1000 / self._fps) - elapsed)))
@@ -1,183 +1,760 @@
-from typing import Dict, Callable, List
+from array import array
+from typing import Deque, Dict, Callable, Generator, Iterable, List, Tuple
+from collections import deque
+import heapq
 import random
-from maze import Maze, MazeDirection, MazePosition
-from cell import CellWallLabels
+from time import perf_counter
+from maze import Maze, MazeDirection, MazePosition, StepEvent, StepEventKind
+from grid import DIRECTION_STEPS, ENTRY_WALLS, visitor_slot
+
+
+# The marks of the searches (see Solver._reused_buffers) are stored as
+# 32-bit integers, and are negated by the bidirectional search.
+MAX_MARK = 0x7FFFFFFF
+
+
+class SolveResult:
+    """
+    SolveResult is the outcome of an attempt to solve the maze.
+    The path is the list of positions from the start position to the end
+    position, and it is empty if the end position was not reached.
+    The number of cells visited is the number of cells the solver marked as
+    visited. The A* solver only marks a cell once it expands it so for A*
+    this is the number of nodes expanded.
+
+    The maximum frontier is the largest number of cells the solver held at
+    once on its stack, queue or heap (for the bidirectional search, on both
+    of its frontiers). The number of backtracks is the number of times the
+    depth-first search backed out of a dead end, and it is 0 for the other
+    solvers. The elapsed time (in seconds) is the wall-clock time from the
+    start of the solve to its end, including any time spent drawing or
+    waiting between steps.
+    """
+
+    def __init__(
+            self,
+            path: List[MazePosition],
+            cells_visited: int,
+            max_frontier: int = 0,
+            backtracks: int = 0,
+            elapsed: float = 0.0,
+    ) -> None:
+        self.path = path
+        self.cells_visited = cells_visited
+        self.max_frontier = max_frontier
+        self.backtracks = backtracks
+        self.elapsed = elapsed
+
+    @property
+    def path_length(self) -> int:
+        """
+        returns the number of positions on the path.
+        """
+        return len(self.path)
+
+    def __bool__(self) -> bool:
+        """
+        returns True if the maze was solved.
+        """
+        return len(self.path) > 0
+
+
+# SolveSteps is the step generator returned by each of the Solver's
+# solve_with_* methods.
+SolveSteps = Generator[StepEvent, None, SolveResult]
+
+# SolveHook is called with every StepEvent of a solve, for example to stream
+# the events to a profiler or a logger.
+SolveHook = Callable[[StepEvent], None]
+
+# SOLVERS maps the name of each solving algorithm to the Solver method that
+# runs it (see Solver.get_solve_method).
+SOLVERS: Dict[str, str] = {
+    "bfs": "solve_with_bfs",
+    "dfs": "solve_with_dfs",
+    "a-star": "solve_with_a_star",
+    "bidirectional-bfs": "solve_with_bidirectional_bfs",
+}
 
 
 class Solver:
-    def __init__(self, game: Maze):
+    """
+    Solver solves a generated maze with one of its solve_with_* methods.
+
+    The solve_with_* methods are step generators. When the maze is animated
+    they yield a StepEvent for every step they take, and once they have
+    finished they return a SolveResult. Use solve() to run one to
+    completion or solve_steps() to drive it one step at a time.
+    """
+
+    def __init__(self, game: Maze, seed=None):
         self._game = game
         self._solver = "solver"
+        self._slot = visitor_slot(self._solver)
 
-        # This is a dictionary mapping the direction to the maze to the
-        # wall of the adjacent cell. It is used to identify the wall that could
-        # potentially block the solver's path.
-        # For example if the solver wants to move to the right, it's path
+        # The solve_with_* methods work with the directions as integers
+        # (the values of MazeDirection), which index the tables of
+        # grid.DIRECTION_STEPS, grid.ENTRY_WALLS and CellGrid.offsets.
+        # For example if the solver wants to move to the right, its path
         # could be blocked by the adjacent cell's left wall.
-        self._wall_map: Dict[MazeDirection, CellWallLabels] = {
-            MazeDirection.ABOVE: CellWallLabels.BOTTOM,
-            MazeDirection.BELOW: CellWallLabels.TOP,
-            MazeDirection.LEFT: CellWallLabels.RIGHT,
-            MazeDirection.RIGHT: CellWallLabels.LEFT,
-        }
+        self._directions = tuple(direction.value for direction in MazeDirection)
+
+        # The solver has its own random number generator so that solving
+        # the maze does not change the state of the global one.
+        self._random = random.Random(seed)
+
+        # The solve_with_* methods only create StepEvents when the maze is
+        # animated or when a hook is listening for them.
+        self._hook: SolveHook = None
 
-        random.seed()
+        # The searches keep their per-cell lists between solves (see
+        # _reused_parents and _reused_buffers).
+        self._parents = array("i")
+        self._costs = array("i")
+        self._marks = array("i")
+        self._mark = 0
 
     def _reset(self):
         self._game.reset_solution(self._solver)
 
+    def get_solve_method(
+        self,
+        name: str,
+    ) -> Callable[[MazePosition, MazePosition, bool], SolveSteps]:
+        """
+        returns the solve_with_* method of the named solving algorithm
+        (see SOLVERS).
+        """
+        if name not in SOLVERS:
+            raise ValueError(f"This is an unknown maze solver ({name})")
+
+        return getattr(self, SOLVERS[name])
+
     def solve(
         self,
-        solve_method: Callable[[MazePosition, MazePosition, bool], bool],
+        solve_method: Callable[[MazePosition, MazePosition, bool], SolveSteps],
         enable_random_direction: bool = False,
-    ) -> bool:
+        hook: SolveHook = None,
+        start: MazePosition = None,
+        end: MazePosition = None,
+    ) -> SolveResult:
         """
-        solve attempts to solve the generated maze.
+        solve attempts to solve the generated maze. If a hook is given it
+        is called with every step the solver takes. The path leads from the
+        start position to the end position, which default to the maze's
+        entrance and exit.
         """
-        start_position = MazePosition(
-            i=0,
-            j=0,
-            last_i=self._game.get_last_i(),
-            last_j=self._game.get_last_j(),
+        return self._game.run_steps(
+            self.solve_steps(solve_method, enable_random_direction, hook, start, end),
         )
 
-        end_position = MazePosition(
-            i=self._game.get_last_i(),
-            j=self._game.get_last_j(),
-            last_i=self._game.get_last_i(),
-            last_j=self._game.get_last_j(),
+    def solve_steps(
+        self,
+        solve_method: Callable[[MazePosition, MazePosition, bool], SolveSteps],
+        enable_random_direction: bool = False,
+        hook: SolveHook = None,
+        start: MazePosition = None,
+        end: MazePosition = None,
+    ) -> SolveSteps:
+        """
+        returns a step generator which attempts to solve the generated maze
+        one step at a time. If a hook is given it is called with every step
+        the solver takes, whether or not the maze is animated. Without a
+        hook no events are created for a maze which is not animated, so the
+        hook costs nothing when it is not used.
+        """
+        start_position = self._checked_position(start, self._game.get_entrance())
+        end_position = self._checked_position(end, self._game.get_exit())
+
+        return self._run(
+            start_position,
+            solve_method(start_position, end_position, enable_random_direction),
+            hook,
         )
 
-        # Clear the maze if there was a previous run
-        if self._game.cell_was_visited_by(
-            i=start_position.i,
-            j=start_position.j,
-            visitor=self._solver,
-        ):
-            self._game.reset_solution(self._solver)
+    def solve_nearest(
+        self,
+        goals: Iterable[MazePosition],
+        enable_random_direction: bool = False,
+        hook: SolveHook = None,
+        start: MazePosition = None,
+    ) -> SolveResult:
+        """
+        returns the shortest path from the start position (the maze's
+        entrance by default) to the nearest of the goal positions. All the
+        goals are searched for at once (see solve_with_multi_goal_bfs), so
+        it is much faster than solving the maze once for each goal.
+        """
+        return self._game.run_steps(
+            self.solve_nearest_steps(goals, enable_random_direction, hook, start),
+        )
 
-        return solve_method(
+    def solve_nearest_steps(
+        self,
+        goals: Iterable[MazePosition],
+        enable_random_direction: bool = False,
+        hook: SolveHook = None,
+        start: MazePosition = None,
+    ) -> SolveSteps:
+        """
+        returns a step generator which searches for the nearest of the goal
+        positions one step at a time (see solve_nearest and solve_steps).
+        """
+        start_position = self._checked_position(start, self._game.get_entrance())
+        goal_positions = [self._checked_position(goal, None) for goal in goals]
+        if not goal_positions:
+            raise ValueError("There must be at least one goal.")
+
+        return self._run(
             start_position,
-            end_position,
-            enable_random_direction,
+            self.solve_with_multi_goal_bfs(
+                start_position,
+                goal_positions,
+                enable_random_direction,
+            ),
+            hook,
         )
 
-    def solve_with_dfs_r(
+    def _checked_position(
+        self,
+        position: MazePosition,
+        default: MazePosition,
+    ) -> MazePosition:
+        """
+        returns the position, or the default if it is None, after checking
+        that it is on the maze.
+        """
+        if position is None:
+            position = default
+
+        last_i = self._game.get_last_i()
+        last_j = self._game.get_last_j()
+        if not (0 <= position.i <= last_i and 0 <= position.j <= last_j):
+            raise ValueError(
+                f"The position ({position.i}, {position.j}) is outside the maze."
+            )
+
+        return MazePosition(i=position.i, j=position.j, last_i=last_i, last_j=last_j)
+
+    def _run(
+        self,
+        start_position: MazePosition,
+        steps: SolveSteps,
+        hook: SolveHook,
+    ) -> SolveSteps:
+        """
+        runs the step generator of a solve_with_* method, clearing the
+        previous solution first and timing the solve.
+        """
+        # Every Solver on the maze shares its visited marks, so they are
+        # always cleared. Clearing them takes the same time however large
+        # the maze is (see CellGrid).
+        self._reset()
+
+        start = perf_counter()
+        self._hook = hook
+        try:
+            if hook is None:
+                result = yield from steps
+            else:
+                result = yield from self._with_hook(steps, hook)
+        finally:
+            self._hook = None
+        result.elapsed = perf_counter() - start
+
+        return result
+
+    def _with_hook(self, steps: SolveSteps, hook: SolveHook) -> SolveSteps:
+        """
+        passes every event of the step generator to the hook, and only
+        yields the events on if the maze is animated.
+        """
+        animated = self._game.is_animated()
+        while True:
+            try:
+                event = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            hook(event)
+            if animated:
+                yield event
+
+    def _emit(self) -> bool:
+        """
+        returns True if the solve_with_* methods need to create StepEvents.
+        """
+        return self._hook is not None or self._game.is_animated()
+
+    def solve_with_dfs(
             self,
-            current_position: MazePosition,
+            start_position: MazePosition,
             end_position: MazePosition,
             enable_random_direction: bool = False,
-    ) -> bool:
-        if current_position == end_position:
-            return True
-
-        self._game.mark_cell_as_visited(
-            i=current_position.i,
-            j=current_position.j,
-            visitor=self._solver,
-        )
+    ) -> SolveSteps:
+        """
+        solve_with_dfs searches the maze depth-first from the start position
+        until it reaches the end position. The current path is kept on an
+        explicit stack of cell indices so the search is not limited by
+        Python's recursion limit, and it is returned as a list of positions
+        when the end position is reached.
 
-        while True:
-            possible_directions: List[MazeDirection] = []
-            for direction in MazeDirection:
-                adjacent_position = current_position.get_adjacent_position(
-                    direction,
+        When random direction is enabled the solver randomly chooses where
+        to go next when it stands before a fork in its path, otherwise it
+        takes the first open direction.
+        """
+        walls, offsets, inside_directions, stamps, epoch = self._grid_arrays()
+        start = start_position.get_index()
+        end = end_position.get_index()
+
+        stamps[start] = epoch
+        cells_visited = 1
+        stack: List[int] = [start]
+        max_frontier = 1
+        backtracks = 0
+        emit = self._emit()
+
+        # possible_directions is reused by every step to avoid allocating a
+        # new list each time the solver chooses a random direction.
+        possible_directions: List[int] = []
+
+        while stack:
+            current = stack[-1]
+            if current == end:
+                path = [self._position(index) for index in stack]
+                if not self._game.is_animated():
+                    self._game.draw_path(path)
+                return SolveResult(
+                    path=path,
+                    cells_visited=cells_visited,
+                    max_frontier=max_frontier,
+                    backtracks=backtracks,
                 )
-                if adjacent_position is None:
-                    continue
-                if self._game.cell_was_visited_by(
-                    i=adjacent_position.i,
-                    j=adjacent_position.j,
-                    visitor=self._solver,
-                ) or self._game.cell_wall_exists(
-                    i=adjacent_position.i,
-                    j=adjacent_position.j,
-                    wall=self._wall_map[direction],
-                ):
+
+            next_direction = None
+            possible_directions.clear()
+            for direction in inside_directions(current):
+                adjacent = current + offsets[direction]
+                if (stamps[adjacent] == epoch) or (walls[adjacent] & ENTRY_WALLS[direction]):
                     continue
+                if not enable_random_direction:
+                    next_direction = direction
+                    break
                 possible_directions.append(direction)
-            if len(possible_directions) == 0:
-                break
-            next_direction = None
-            if len(possible_directions) == 1 or not enable_random_direction:
+
+            if len(possible_directions) == 1:
                 next_direction = possible_directions[0]
-            else:
-                next_direction = random.choice(possible_directions)
-            next_position = current_position.get_adjacent_position(
-                next_direction,
-            )
-            self._game.draw_path_between(current_position, next_position)
-            solved = self.solve_with_dfs_r(
-                next_position, end_position)
-            if solved:
-                return True
-            self._game.draw_path_between(
-                current_position,
-                next_position,
-                undo=True
-            )
+            elif len(possible_directions) > 1:
+                next_direction = self._random.choice(possible_directions)
+
+            if next_direction is None:
+                stack.pop()
+                if stack:
+                    backtracks += 1
+                    if emit:
+                        yield StepEvent(StepEventKind.BACKTRACK, stack[-1], current)
+                continue
+
+            next_cell = current + offsets[next_direction]
+            stamps[next_cell] = epoch
+            cells_visited += 1
+            if emit:
+                yield StepEvent(StepEventKind.VISIT, current, next_cell)
+            stack.append(next_cell)
+            if len(stack) > max_frontier:
+                max_frontier = len(stack)
 
-        return False
+        return SolveResult(
+            path=[],
+            cells_visited=cells_visited,
+            max_frontier=max_frontier,
+            backtracks=backtracks,
+        )
 
-    def solve_with_bfs_r(
+    def solve_with_bfs(
         self,
-        current_position: MazePosition,
+        start_position: MazePosition,
         end_position: MazePosition,
         enable_random_direction: bool = False,
-    ) -> bool:
-        self._game.mark_cell_as_visited(
-            i=current_position.i,
-            j=current_position.j,
-            visitor=self._solver,
+    ) -> SolveSteps:
+        """
+        solve_with_bfs searches the maze breadth-first from the start
+        position and returns the shortest path to the end position as a
+        list of positions. The path is empty if the end position cannot be
+        reached. The search stops as soon as the end position is
+        found. It is the multi-goal search (see solve_with_multi_goal_bfs)
+        with the end position as its only goal.
+
+        When random direction is enabled the order in which the neighbours
+        of each cell are queued is shuffled. This changes the order in which
+        the cells are visited and which path is returned when there are
+        several shortest paths.
+        """
+        return (yield from self.solve_with_multi_goal_bfs(
+            start_position,
+            [end_position],
+            enable_random_direction,
+        ))
+
+    def solve_with_multi_goal_bfs(
+        self,
+        start_position: MazePosition,
+        goal_positions: List[MazePosition],
+        enable_random_direction: bool = False,
+    ) -> SolveSteps:
+        """
+        solve_with_multi_goal_bfs searches the maze breadth-first from the
+        start position and returns the shortest path to the nearest of the
+        goal positions. The search stops as soon as any goal is found, so
+        it never explores more of the maze than a search for that goal on
+        its own would.
+
+        When random direction is enabled the order in which the neighbours
+        of each cell are queued is shuffled.
+        """
+        walls, offsets, inside_directions, stamps, epoch = self._grid_arrays()
+        start = start_position.get_index()
+        goals = {goal.get_index() for goal in goal_positions}
+
+        # parents maps the index of each visited cell to the index of the
+        # cell it was reached from (see _reused_parents).
+        parents = self._reused_parents(len(walls))
+        parents[start] = -1
+
+        stamps[start] = epoch
+        cells_visited = 1
+        queue: Deque[int] = deque([start])
+        max_frontier = 1
+        emit = self._emit()
+        directions = list(self._directions)
+        found = start if start in goals else -1
+
+        while queue and found == -1:
+            current = queue.popleft()
+            inside = inside_directions(current)
+            if enable_random_direction:
+                self._random.shuffle(directions)
+            for direction in directions:
+                if direction not in inside:
+                    continue
+                adjacent = current + offsets[direction]
+                if (stamps[adjacent] == epoch) or (walls[adjacent] & ENTRY_WALLS[direction]):
+                    continue
+                stamps[adjacent] = epoch
+                cells_visited += 1
+                parents[adjacent] = current
+                if emit:
+                    yield StepEvent(StepEventKind.EXPLORE, current, adjacent)
+                if adjacent in goals:
+                    found = adjacent
+                    break
+                queue.append(adjacent)
+            if len(queue) > max_frontier:
+                max_frontier = len(queue)
+
+        if found == -1:
+            return SolveResult(
+                path=[],
+                cells_visited=cells_visited,
+                max_frontier=max_frontier,
+            )
+
+        path = self._path_to(found, parents)
+        self._game.draw_path(path)
+
+        return SolveResult(
+            path=path,
+            cells_visited=cells_visited,
+            max_frontier=max_frontier,
         )
 
-        while True:
-            possible_directions = []
-            for direction in MazeDirection:
-                adjacent_position = current_position.get_adjacent_position(
-                    direction,
+    def solve_with_a_star(
+        self,
+        start_position: MazePosition,
+        end_position: MazePosition,
+        enable_random_direction: bool = False,
+    ) -> SolveSteps:
+        """
+        solve_with_a_star searches the maze with the A* algorithm and returns
+        the shortest path from the start position to the end position. The
+        cells are expanded from a binary heap in order of the length of the
+        path so far plus the Manhattan distance to the end position, so the
+        cells that lead away from the end position are expanded last.
+
+        When random direction is enabled the order in which the neighbours
+        of each cell are pushed onto the heap is shuffled.
+        """
+        width = self._game.get_last_j() + 1
+        walls, offsets, inside_directions, stamps, epoch = self._grid_arrays()
+        start = start_position.get_index()
+        end_i = end_position.i
+        end_j = end_position.j
+
+        # costs maps the index of each discovered cell to the length of the
+        # shortest known path to it, and parents maps it to the cell that
+        # path came from. Both are only valid for the cells marked with
+        # this search's mark (see _reused_buffers).
+        parents, costs, marks, mark = self._reused_buffers(len(walls))
+        parents[start] = -1
+        costs[start] = 0
+        marks[start] = mark
+
+        # The heap entries are ordered by the estimated length of the whole
+        # path. Ties are broken in favour of the cell closest to the end.
+        distance = abs(start_position.i - end_i) + abs(start_position.j - end_j)
+        frontier: List[Tuple[int, int, int]] = [(distance, distance, start)]
+        cells_visited = 0
+        max_frontier = 1
+        emit = self._emit()
+        directions = list(self._directions)
+
+        while frontier:
+            _, distance, current = heapq.heappop(frontier)
+            i = current // width
+            j = current - (i * width)
+
+            # A cell can be pushed more than once if a shorter path to it is
+            # found. Only the first (shortest) one is expanded.
+            if stamps[current] == epoch:
+                continue
+            stamps[current] = epoch
+            cells_visited += 1
+
+            if distance == 0:
+                path = self._path_to(current, parents)
+                self._game.draw_path(path)
+                return SolveResult(
+                    path=path,
+                    cells_visited=cells_visited,
+                    max_frontier=max_frontier,
                 )
 
-                if adjacent_position is None:
+            cost = costs[current] + 1
+            inside = inside_directions(current)
+            if enable_random_direction:
+                self._random.shuffle(directions)
+            for direction in directions:
+                if direction not in inside:
+                    continue
+                adjacent = current + offsets[direction]
+                if (stamps[adjacent] == epoch) or (walls[adjacent] & ENTRY_WALLS[direction]):
                     continue
-                if self._game.cell_was_visited_by(
-                        i=adjacent_position.i,
-                        j=adjacent_position.j,
-                        visitor=self._solver,
-                ) or self._game.cell_wall_exists(
-                    i=adjacent_position.i,
-                    j=adjacent_position.j,
-                    wall=self._wall_map[direction],
-                ):
+                if (marks[adjacent] == mark) and (costs[adjacent] <= cost):
                     continue
-                if adjacent_position == end_position:
-                    self._game.draw_path_between(
-                        current_position, adjacent_position)
-                    return True
+                marks[adjacent] = mark
+                costs[adjacent] = cost
+                parents[adjacent] = current
+                offset_i, offset_j = DIRECTION_STEPS[direction]
+                distance = abs(i + offset_i - end_i) + abs(j + offset_j - end_j)
+                heapq.heappush(
+                    frontier,
+                    (cost + distance, distance, adjacent),
+                )
+                if emit:
+                    yield StepEvent(StepEventKind.EXPLORE, current, adjacent)
+            if len(frontier) > max_frontier:
+                max_frontier = len(frontier)
 
-                possible_directions.append(direction)
-            if len(possible_directions) == 0:
-                break
-            next_direction = None
-            if len(possible_directions) == 1 or not enable_random_direction:
-                next_direction = possible_directions[0]
-            else:
-                next_direction = random.choice(possible_directions)
-            next_position = current_position.get_adjacent_position(
-                next_direction,
-            )
-            self._game.draw_path_between(current_position, next_position)
-            solved = self.solve_with_bfs_r(
-                next_position,
-                end_position,
-                enable_random_direction
+        return SolveResult(
+            path=[],
+            cells_visited=cells_visited,
+            max_frontier=max_frontier,
+        )
+
+    def solve_with_bidirectional_bfs(
+        self,
+        start_position: MazePosition,
+        end_position: MazePosition,
+        enable_random_direction: bool = False,
+    ) -> SolveSteps:
+        """
+        solve_with_bidirectional_bfs runs two breadth-first searches, one
+        from the start position and one from the end position, and returns
+        the shortest path once they meet in the middle. The search with the
+        smaller frontier is always the one that is advanced by a level, so
+        neither search has to explore much more than half of the way.
+
+        When random direction is enabled the order in which the neighbours
+        of each cell are queued is shuffled.
+        """
+        walls, offsets, inside_directions, stamps, epoch = self._grid_arrays()
+        cells = len(walls)
+        start = start_position.get_index()
+        end = end_position.get_index()
+
+        if start == end:
+            stamps[start] = epoch
+            return SolveResult(
+                path=[start_position],
+                cells_visited=1,
+                max_frontier=1,
             )
-            if solved:
-                return True
-            self._game.draw_path_between(
-                current_position,
-                next_position,
-                undo=True
+
+        # marks records which of the two searches visited each cell: the
+        # forward search marks its cells with this search's mark and the
+        # backward search with its negative (see _reused_buffers).
+        # distances records how far each visited cell is from the position
+        # its search started from, and parents records the cell each visited
+        # cell was reached from.
+        parents, distances, marks, mark = self._reused_buffers(cells)
+        forward = mark
+        backward = -mark
+        frontiers: Dict[int, List[int]] = {forward: [start], backward: [end]}
+
+        for side, cell in ((forward, start), (backward, end)):
+            marks[cell] = side
+            distances[cell] = 0
+            parents[cell] = -1
+            stamps[cell] = epoch
+        cells_visited = 2
+        max_frontier = 2
+        emit = self._emit()
+        directions = list(self._directions)
+
+        # meeting holds the pair of adjacent cells, one from each search,
+        # that joins the shortest path found so far.
+        meeting: Tuple[int, int] = None
+        shortest = -1
+
+        while frontiers[forward] and frontiers[backward] and meeting is None:
+            side = forward
+            if len(frontiers[backward]) < len(frontiers[forward]):
+                side = backward
+            next_frontier: List[int] = []
+
+            # The whole level is expanded even after the searches meet
+            # because a later cell in the level may join a shorter path.
+            for current in frontiers[side]:
+                inside = inside_directions(current)
+                if enable_random_direction:
+                    self._random.shuffle(directions)
+                for direction in directions:
+                    if direction not in inside:
+                        continue
+                    adjacent = current + offsets[direction]
+                    if (marks[adjacent] == side) or (walls[adjacent] & ENTRY_WALLS[direction]):
+                        continue
+                    if marks[adjacent] == -side:
+                        length = distances[current] + distances[adjacent] + 1
+                        if (shortest == -1) or (length < shortest):
+                            shortest = length
+                            meeting = (current, adjacent)
+                        continue
+                    marks[adjacent] = side
+                    distances[adjacent] = distances[current] + 1
+                    parents[adjacent] = current
+                    stamps[adjacent] = epoch
+                    cells_visited += 1
+                    if emit:
+                        yield StepEvent(StepEventKind.EXPLORE, current, adjacent)
+                    next_frontier.append(adjacent)
+
+            frontiers[side] = next_frontier
+            frontier_size = len(frontiers[forward]) + len(frontiers[backward])
+            if frontier_size > max_frontier:
+                max_frontier = frontier_size
+
+        if meeting is None:
+            return SolveResult(
+                path=[],
+                cells_visited=cells_visited,
+                max_frontier=max_frontier,
             )
 
-        return False
+        forward_cell, backward_cell = meeting
+        if marks[forward_cell] == backward:
+            backward_cell, forward_cell = meeting
+
+        path = self._path_to(forward_cell, parents)
+        current = backward_cell
+        while current != -1:
+            path.append(self._position(current))
+            current = parents[current]
+
+        self._game.draw_path(path)
+
+        return SolveResult(
+            path=path,
+            cells_visited=cells_visited,
+            max_frontier=max_frontier,
+        )
+
+    def _grid_arrays(self):
+        """
+        returns the walls of the maze, the index offsets of the neighbouring
+        cells, the grid's inside_directions method (which finds the
+        neighbours of a cell without checking the bounds of every
+        direction) and the solver's visited stamps and epoch (see
+        CellGrid). The solve_with_* methods use these directly instead of
+        the Maze's methods, which check their arguments on every call.
+        """
+        grid = self._game.get_cell_grid()
+
+        return (
+            grid.walls,
+            grid.offsets,
+            grid.inside_directions,
+            grid.stamps[self._slot],
+            grid.epochs[self._slot],
+        )
+
+    def _reused_parents(self, cells: int) -> array:
+        """
+        returns an array with an entry for every cell which the searches
+        use to record the cell each cell was reached from. The array is kept
+        between solves so that a short search on a large maze does not have
+        to allocate it again. Only the entries of the cells visited by the
+        current search are ever read, so the entries left over from earlier
+        searches do not need to be cleared. Like the other per-cell buffers
+        it is an array of 32-bit integers rather than a list, which would
+        hold a pointer and an int object for every cell.
+        """
+        if len(self._parents) != cells:
+            self._parents = array("i", [-1]) * cells
+
+        return self._parents
+
+    def _reused_buffers(self, cells: int) -> Tuple[array, array, array, int]:
+        """
+        returns the parents (see _reused_parents), an array of costs and an
+        array of marks with an entry for every cell, and a new mark for the
+        search. A* and the bidirectional search record the length of the
+        path to each cell they reach as its cost and mark the cell with
+        their mark. A cost is only valid if the cell has the current
+        search's mark, so like the parents the arrays are kept between
+        solves and are never cleared, unless the marks run out. A short
+        search on a large maze then costs no more than the cells it
+        reaches.
+        """
+        parents = self._reused_parents(cells)
+        if len(self._costs) != cells or self._mark == MAX_MARK:
+            self._costs = array("i", [0]) * cells
+            self._marks = array("i", [0]) * cells
+            self._mark = 0
+        self._mark += 1
+
+        return parents, self._costs, self._marks, self._mark
+
+    def _path_to(self, end: int, parents: array) -> List[MazePosition]:
+        """
+        follows the parents of each cell from the cell at the specified
+        index back to the start and returns the path from the start to
+        that cell.
+        """
+        path: List[MazePosition] = []
+        current = end
+        while current != -1:
+            path.append(self._position(current))
+            current = parents[current]
+        path.reverse()
+
+        return path
+
+    def _position(self, index: int) -> MazePosition:
+        """
+        returns the maze position of the cell at the specified index.
+        """
+        return MazePosition.from_index(
+            index,
+            self._game.get_last_i(),
+            self._game.get_last_j(),
+        )
@@ -0,0 +1,55 @@
+import argparse
+import random
+import sys
+from typing import Iterator
+from cell import CellWallLabels
+from cli import maze_size
+from grid import WALL_BITS
+from generators import eller_rows
+from mazefile import MazeFileHeader, write_header, write_rows
+
+
+def eller_maze_rows(width: int, height: int, seed=None) -> Iterator[bytearray]:
+    """
+    generates a maze with Eller's algorithm and yields it one row at a time,
+    with the entrance at the top left and the exit at the bottom right (just
+    like Maze). Only O(width) state is kept in memory so the height of the
+    maze is unlimited.
+    """
+    rows = eller_rows(width, height, random.Random(seed))
+    for i, row in enumerate(rows):
+        if i == 0:
+            row[0] &= ~WALL_BITS[CellWallLabels.TOP]
+        if i == height - 1:
+            row[width - 1] &= ~WALL_BITS[CellWallLabels.BOTTOM]
+        yield row
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Streams a maze generated with Eller's algorithm one row at a time in the maze file format.",
+    )
+    parser.add_argument("--height", type=maze_size, required=True)
+    parser.add_argument("--width", type=maze_size, required=True)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="the file to write the maze to, or - for the standard output",
+    )
+    args = parser.parse_args()
+
+    header = MazeFileHeader(args.height, args.width, "eller", args.seed)
+    rows = eller_maze_rows(args.width, args.height, args.seed)
+    if args.output == "-":
+        write_header(sys.stdout.buffer, header)
+        write_rows(rows, sys.stdout.buffer)
+        return
+
+    with open(args.output, "wb") as output:
+        write_header(output, header)
+        write_rows(rows, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
 import unittest
+from unittest import mock
 from cell import Cell, CellWallLabels
+import batch
+import grid
+from grid import CellGrid, DIRECTION_STEPS, MAX_EPOCH, VISITORS, visitor_slot
+from generators import GENERATORS
 import maze
+import mazefile
+import renderer
+import solver
 import errors
+from scheduler import Scheduler
+import stream
+import treeindex
+
+try:
+    import analysis
+except ImportError:
+    analysis = None
+
+
+class FakeWidget:
+    """
+    FakeWidget stands in for a Tk widget's after() and after_cancel()
+    methods. The scheduled callbacks only run when run_next() is called.
+    """
+
+    def __init__(self):
+        self.callbacks = {}
+        self._next_id = 0
+
+    def after(self, delay, callback):
+        self._next_id += 1
+        self.callbacks[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        del self.callbacks[after_id]
+
+    def run_next(self):
+        after_id = min(self.callbacks)
+        self.callbacks.pop(after_id)()
 
 
 class Tests(unittest.TestCase):
@@ -41,13 +88,17 @@ class Tests(unittest.TestCase):
             )
             m.generate()
             self.assertEqual(
-                len(m._cell_grid),
+                m._cell_grid.height,
                 case["height"],
             )
             self.assertEqual(
-                len(m._cell_grid[0]),
+                m._cell_grid.width,
                 case["width"],
             )
+            self.assertEqual(
+                len(m._cell_grid.walls),
+                case["height"] * case["width"],
+            )
 
     def test_break_entrance_and_exit(self):
         """
@@ -67,11 +118,1191 @@ class Tests(unittest.TestCase):
             None,
         )
         m.generate()
-        self.assertFalse(m._cell_grid[0][0].wall_exists(CellWallLabels.TOP))
+        self.assertFalse(m.cell_wall_exists(0, 0, CellWallLabels.TOP))
         self.assertFalse(
-            m._cell_grid[number_of_cell_rows - 1]
-            [number_of_cells_per_row - 1].wall_exists(CellWallLabels.BOTTOM)
+            m.cell_wall_exists(
+                number_of_cell_rows - 1,
+                number_of_cells_per_row - 1,
+                CellWallLabels.BOTTOM,
+            )
+        )
+
+    def test_generate_large_maze(self):
+        """
+        test_generate_large_maze tests that a maze with more cells than
+        Python's recursion limit can be generated and that every cell is
+        reachable from the entrance.
+        """
+        height = 60
+        width = 60
+        m = maze.Maze(0, 0, height, width, 2, 2, None, 1)
+        m.generate()
+
+        for i in range(height):
+            for j in range(width):
+                self.assertTrue(m.cell_was_visited_by(i, j, "generator"))
+
+        # A perfect maze is a spanning tree so it has exactly one passage
+        # fewer than it has cells.
+        passages = 0
+        for i in range(height):
+            for j in range(width):
+                if i < height - 1 and not m.cell_wall_exists(
+                        i, j, CellWallLabels.BOTTOM):
+                    passages += 1
+                if j < width - 1 and not m.cell_wall_exists(
+                        i, j, CellWallLabels.RIGHT):
+                    passages += 1
+        self.assertEqual(passages, (height * width) - 1)
+
+    def test_generate_is_reproducible(self):
+        """
+        test_generate_is_reproducible tests that two mazes generated with
+        the same seed are identical.
+        """
+        height = 15
+        width = 20
+        m1 = maze.Maze(0, 0, height, width, 2, 2, None, 42)
+        m1.generate()
+        m2 = maze.Maze(0, 0, height, width, 2, 2, None, 42)
+        m2.generate()
+
+        for i in range(height):
+            for j in range(width):
+                for wall in CellWallLabels:
+                    self.assertEqual(
+                        m1.cell_wall_exists(i, j, wall),
+                        m2.cell_wall_exists(i, j, wall),
+                    )
+
+    def test_random_number_generators_are_isolated(self):
+        """
+        test_random_number_generators_are_isolated tests that generating a
+        maze is not affected by creating other mazes and solvers, by the
+        global random number generator or by generating other mazes at the
+        same time in other threads.
+        """
+        expected = {}
+        for seed in range(8):
+            m = maze.Maze(0, 0, 20, 20, 2, 2, None, seed)
+            m.generate()
+            expected[seed] = bytes(m._cell_grid.walls)
+
+        m = maze.Maze(0, 0, 20, 20, 2, 2, None, 3)
+        other = maze.Maze(0, 0, 20, 20, 2, 2, None, 4)
+        solver.Solver(other, seed=5)
+        random.seed(6)
+        random.random()
+        m.generate()
+        self.assertEqual(bytes(m._cell_grid.walls), expected[3])
+
+        def generate(seed: int) -> bytes:
+            m = maze.Maze(0, 0, 20, 20, 2, 2, None, seed)
+            m.generate()
+            return bytes(m._cell_grid.walls)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = dict(zip(expected, executor.map(generate, expected)))
+        self.assertEqual(results, expected)
+
+    def test_solve_with_bfs_finds_shortest_path(self):
+        """
+        test_solve_with_bfs_finds_shortest_path tests that the breadth-first
+        search returns the shortest path through a maze which has more than
+        one path between the entrance and the exit.
+        """
+        height = 6
+        width = 8
+        m = maze.Maze(0, 0, height, width, 2, 2, None, 3)
+        m.generate()
+
+        # Knock down every inner wall so that there are many possible paths.
+        for i in range(height):
+            for j in range(width):
+                m._configure_cell_walls(
+                    i=i,
+                    j=j,
+                    top=(i == 0) and (j != 0),
+                    bottom=(i == height - 1) and (j != width - 1),
+                    left=(j == 0),
+                    right=(j == width - 1),
+                )
+
+        s = solver.Solver(m)
+        result = s.solve(s.solve_with_bfs)
+        self.assertEqual(len(result.path), height + width - 1)
+        self.assert_valid_path(m, result.path)
+
+    def test_solve_with_bfs_large_maze(self):
+        """
+        test_solve_with_bfs_large_maze tests that the breadth-first search
+        can solve a maze with more cells than Python's recursion limit.
+        """
+        m = maze.Maze(0, 0, 60, 60, 2, 2, None, 5)
+        m.generate()
+        s = solver.Solver(m)
+        result = s.solve(s.solve_with_bfs, enable_random_direction=True)
+        self.assert_valid_path(m, result.path)
+
+    def test_solve_with_dfs_large_maze(self):
+        """
+        test_solve_with_dfs_large_maze tests that the depth-first search can
+        solve a maze whose path is longer than Python's recursion limit.
+        """
+        for enable_random_direction in (False, True):
+            m = maze.Maze(0, 0, 60, 60, 2, 2, None, 5)
+            m.generate()
+            s = solver.Solver(m, seed=7)
+            result = s.solve(s.solve_with_dfs, enable_random_direction)
+            self.assert_valid_path(m, result.path)
+            self.assertGreaterEqual(result.cells_visited, len(result.path))
+            self.assertLessEqual(result.cells_visited, 60 * 60)
+
+    def test_solve_with_dfs_is_reproducible(self):
+        """
+        test_solve_with_dfs_is_reproducible tests that two solvers with the
+        same seed take the same random turns through the maze.
+        """
+        results = []
+        for _ in range(2):
+            m = maze.Maze(0, 0, 20, 20, 2, 2, None, 9)
+            m.generate()
+            s = solver.Solver(m, seed=11)
+            results.append(s.solve(s.solve_with_dfs, True))
+        self.assertEqual(results[0].path, results[1].path)
+        self.assertEqual(results[0].cells_visited, results[1].cells_visited)
+
+    def test_solve_with_a_star(self):
+        """
+        test_solve_with_a_star tests that A* finds a path as short as the
+        one found by the breadth-first search in a maze with loops, while
+        expanding fewer cells.
+        """
+        height = 30
+        width = 30
+        m = maze.Maze(0, 0, height, width, 2, 2, None, 8)
+        m.generate()
+
+        # Knock down some of the inner walls to create loops in the maze.
+        for i in range(1, height, 3):
+            for j in range(0, width - 1, 2):
+                m._configure_cell_walls(i=i, j=j, right=False)
+                m._configure_cell_walls(i=i, j=j+1, left=False)
+
+        s = solver.Solver(m)
+        bfs = s.solve(s.solve_with_bfs)
+        a_star = s.solve(s.solve_with_a_star)
+        self.assert_valid_path(m, a_star.path)
+        self.assertEqual(len(a_star.path), len(bfs.path))
+        self.assertLess(a_star.cells_visited, bfs.cells_visited)
+
+    def test_solve_with_bidirectional_bfs(self):
+        """
+        test_solve_with_bidirectional_bfs tests that the bidirectional
+        breadth-first search finds a path as short as the one found by the
+        breadth-first search, both in a perfect maze and in a maze with loops.
+        """
+        height = 25
+        width = 35
+        m = maze.Maze(0, 0, height, width, 2, 2, None, 13)
+        m.generate()
+        s = solver.Solver(m, seed=2)
+
+        for _ in range(2):
+            bfs = s.solve(s.solve_with_bfs)
+            bidirectional = s.solve(s.solve_with_bidirectional_bfs, True)
+            self.assert_valid_path(m, bidirectional.path)
+            self.assertEqual(len(bidirectional.path), len(bfs.path))
+
+            # Knock down some of the inner walls to create loops in the maze.
+            for i in range(0, height - 1, 2):
+                for j in range(1, width, 4):
+                    m._configure_cell_walls(i=i, j=j, bottom=False)
+                    m._configure_cell_walls(i=i+1, j=j, top=False)
+
+    def test_solve_result_instrumentation(self):
+        """
+        test_solve_result_instrumentation tests that each solver reports its
+        maximum frontier, backtracks and elapsed time, that a hook receives
+        every step of a headless solve, and that no steps are created when
+        there is no hook.
+        """
+        m = maze.Maze(0, 0, 25, 25, 2, 2, None, 8)
+        m.generate()
+        s = solver.Solver(m, seed=2)
+        for name in solver.SOLVERS:
+            with mock.patch.object(solver, "StepEvent") as step_event:
+                plain = s.solve(s.get_solve_method(name))
+            step_event.assert_not_called()
+
+            events = []
+            result = s.solve(s.get_solve_method(name), hook=events.append)
+            self.assertEqual(result.path_length, len(result.path))
+            self.assertEqual(result.path, plain.path)
+            self.assertEqual(result.cells_visited, plain.cells_visited)
+            self.assertEqual(result.max_frontier, plain.max_frontier)
+            self.assertGreaterEqual(result.max_frontier, 1)
+            self.assertGreater(result.elapsed, 0)
+            self.assertGreater(len(events), 0)
+
+            backtracks = sum(
+                event.kind is maze.StepEventKind.BACKTRACK for event in events
+            )
+            self.assertEqual(result.backtracks, backtracks)
+            if name == "dfs":
+                self.assertEqual(
+                    result.cells_visited,
+                    len(result.path) + result.backtracks,
+                )
+            else:
+                self.assertEqual(result.backtracks, 0)
+
+    def test_generators(self):
+        """
+        test_generators tests that every maze generation algorithm generates
+        a perfect maze (one where there is exactly one path between any two
+        cells), and that it generates the same maze for the same seed.
+        """
+        for algorithm in GENERATORS:
+            for height, width in ((1, 1), (1, 7), (9, 1), (13, 17)):
+                m = maze.Maze(0, 0, height, width, 2, 2, None, 31)
+                m.generate(algorithm)
+                self.assert_perfect_maze(m)
+                self.assertFalse(m.cell_wall_exists(0, 0, CellWallLabels.TOP))
+                self.assertFalse(m.cell_wall_exists(
+                    height - 1,
+                    width - 1,
+                    CellWallLabels.BOTTOM,
+                ))
+
+                again = maze.Maze(0, 0, height, width, 2, 2, None, 31)
+                again.generate(algorithm)
+                self.assertEqual(
+                    again._cell_grid.walls,
+                    m._cell_grid.walls,
+                    algorithm,
+                )
+
+        with self.assertRaises(ValueError):
+            m.generate("unknown")
+
+    def test_stream_maze(self):
+        """
+        test_stream_maze tests that a maze streamed one row at a time can be
+        loaded back into a Maze, and that it is the same maze that Maze
+        generates with Eller's algorithm for the same seed.
+        """
+        for width in (1, 2, 7, 8):
+            row = bytearray(range(16)) * width
+            del row[width:]
+            packed = grid.pack_row(row)
+            self.assertEqual(len(packed), grid.packed_row_size(width))
+            self.assertEqual(grid.unpack_row(packed, width), row)
+
+        height, width = 23, 17
+        output = io.BytesIO()
+        written = mazefile.write_rows(
+            stream.eller_maze_rows(width, height, seed=5),
+            output,
+        )
+        self.assertEqual(written, height * grid.packed_row_size(width))
+
+        output.seek(0)
+        m = maze.Maze(0, 0, height, width, 2, 2, None)
+        m.load_rows(mazefile.read_rows(output, width, height))
+        self.assert_perfect_maze(m)
+
+        generated = maze.Maze(0, 0, height, width, 2, 2, None, 5)
+        generated.generate("eller")
+        self.assertEqual(m._cell_grid.walls, generated._cell_grid.walls)
+
+        # The rows replace the generator and the seed of a generated maze.
+        generated.load_rows([bytearray([grid.ALL_WALLS]) * width] * height)
+        header = mazefile.MazeFileHeader(height, width, "", None)
+        self.assertIsNone(generated.get_generator())
+        self.assertIsNone(generated.get_seed())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.bin")
+            generated.save(path)
+            with open(path, "rb") as file:
+                self.assertEqual(mazefile.read_header(file), header)
+
+        output.seek(0)
+        with self.assertRaises(ValueError):
+            m.load_rows(mazefile.read_rows(output, width, height + 1))
+        with self.assertRaises(ValueError):
+            m.load_rows([bytearray(width - 1)] * height)
+
+    def test_save_and_load_maze(self):
+        """
+        test_save_and_load_maze tests that a maze saved to a maze file is
+        loaded back with the same walls, generator and seed, and that the
+        loaded maze can be solved and saved again.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.bin")
+            for height, width in ((1, 1), (9, 1), (13, 17), (12, 20)):
+                m = maze.Maze(0, 0, height, width, 2, 2, None, 77)
+                m.generate("kruskal")
+                m.save(path)
+                self.assertEqual(
+                    os.path.getsize(path),
+                    24 + len("kruskal") + (height * grid.packed_row_size(width)),
+                )
+
+                loaded = maze.Maze(0, 0, 1, 1, 2, 2, None)
+                loaded.load(path)
+                self.assertEqual(loaded.get_last_i(), height - 1)
+                self.assertEqual(loaded.get_last_j(), width - 1)
+                self.assertEqual(loaded._generator, "kruskal")
+                self.assertEqual(loaded._seed, 77)
+                for i in range(height):
+                    for j in range(width):
+                        for wall in CellWallLabels:
+                            self.assertEqual(
+                                loaded.cell_wall_exists(i, j, wall),
+                                m.cell_wall_exists(i, j, wall),
+                            )
+
+                s = solver.Solver(m)
+                expected = s.solve(s.solve_with_bfs)
+                s = solver.Solver(loaded)
+                result = s.solve(s.solve_with_bfs)
+                self.assertEqual(result.path, expected.path)
+
+                copy_path = os.path.join(directory, "copy.bin")
+                loaded.save(copy_path)
+                with open(path, "rb") as original, open(copy_path, "rb") as copy:
+                    self.assertEqual(copy.read(), original.read())
+                loaded.close()
+
+            # A maze file streamed one row at a time can be loaded too.
+            output = io.BytesIO()
+            header = mazefile.MazeFileHeader(30, 11, "eller", 3)
+            mazefile.write_header(output, header)
+            mazefile.write_rows(stream.eller_maze_rows(11, 30, 3), output)
+            with open(path, "wb") as file:
+                file.write(output.getvalue())
+            m.load(path)
+            self.assertFalse(m.cell_wall_exists(0, 0, CellWallLabels.TOP))
+            self.assert_perfect_maze(m)
+
+            # The mapped file is closed when the maze is loaded or
+            # generated again, or closed.
+            first = m._cell_grid.walls
+            m.load(path)
+            self.assertTrue(first._buffer.closed)
+            second = m._cell_grid.walls
+            m.generate()
+            self.assertTrue(second._buffer.closed)
+            m.load(path)
+            m.close()
+            self.assertTrue(m._cell_grid.walls._buffer.closed)
+
+            with open(path, "wb") as file:
+                file.write(output.getvalue()[:-1])
+            with self.assertRaises(ValueError):
+                m.load(path)
+            with open(path, "wb") as file:
+                file.write(b"NOPE" + output.getvalue()[4:])
+            with self.assertRaises(ValueError):
+                m.load(path)
+
+        with self.assertRaises(ValueError):
+            mazefile.MazeFileHeader(1, 1, "eller", "not an integer")
+        for height, width in ((0, 1), (1, 0), (-2, 3), (2 ** 32, 1)):
+            with self.assertRaises(ValueError):
+                mazefile.MazeFileHeader(height, width, "eller")
+
+        # A header with an empty maze is rejected when it is read.
+        output = io.BytesIO()
+        mazefile.write_header(output, mazefile.MazeFileHeader(1, 1, "eller"))
+        data = bytearray(output.getvalue())
+        data[8:12] = bytes(4)
+        with self.assertRaises(ValueError):
+            mazefile.read_header(io.BytesIO(bytes(data)))
+
+    def assert_perfect_maze(self, m: maze.Maze):
+        """
+        assert_perfect_maze asserts that the walls between neighbouring
+        cells agree with each other and that every cell of the maze can be
+        reached through exactly one path.
+        """
+        height = m.get_last_i() + 1
+        width = m.get_last_j() + 1
+        passages = 0
+        for i in range(height):
+            for j in range(width):
+                if i < height - 1:
+                    bottom = m.cell_wall_exists(i, j, CellWallLabels.BOTTOM)
+                    top = m.cell_wall_exists(i + 1, j, CellWallLabels.TOP)
+                    self.assertEqual(bottom, top)
+                    passages += not bottom
+                if j < width - 1:
+                    right = m.cell_wall_exists(i, j, CellWallLabels.RIGHT)
+                    left = m.cell_wall_exists(i, j + 1, CellWallLabels.LEFT)
+                    self.assertEqual(right, left)
+                    passages += not right
+                if j == 0:
+                    self.assertTrue(m.cell_wall_exists(i, j, CellWallLabels.LEFT))
+                if j == width - 1:
+                    self.assertTrue(m.cell_wall_exists(i, j, CellWallLabels.RIGHT))
+        self.assertEqual(passages, (height * width) - 1)
+
+        s = solver.Solver(m)
+        result = s.solve(s.solve_with_bfs)
+        self.assert_valid_path(m, result.path)
+        reachable = [(0, 0)]
+        seen = {(0, 0)}
+        moves = (
+            (CellWallLabels.TOP, -1, 0),
+            (CellWallLabels.BOTTOM, 1, 0),
+            (CellWallLabels.LEFT, 0, -1),
+            (CellWallLabels.RIGHT, 0, 1),
+        )
+        while reachable:
+            i, j = reachable.pop()
+            for wall, offset_i, offset_j in moves:
+                next_cell = (i + offset_i, j + offset_j)
+                if m.cell_wall_exists(i, j, wall) or next_cell in seen:
+                    continue
+                if not (0 <= next_cell[0] < height and 0 <= next_cell[1] < width):
+                    continue
+                seen.add(next_cell)
+                reachable.append(next_cell)
+        self.assertEqual(len(seen), height * width)
+
+    def assert_valid_path(self, m: maze.Maze, path):
+        """
+        assert_valid_path asserts that the path leads from the maze's
+        entrance to its exit without walking through any walls.
+        """
+        self.assertEqual((path[0].i, path[0].j), (0, 0))
+        self.assertEqual(
+            (path[-1].i, path[-1].j),
+            (m.get_last_i(), m.get_last_j()),
+        )
+        for a, b in zip(path, path[1:]):
+            if b.i == a.i - 1 and b.j == a.j:
+                wall = CellWallLabels.TOP
+            elif b.i == a.i + 1 and b.j == a.j:
+                wall = CellWallLabels.BOTTOM
+            elif b.i == a.i and b.j == a.j - 1:
+                wall = CellWallLabels.LEFT
+            elif b.i == a.i and b.j == a.j + 1:
+                wall = CellWallLabels.RIGHT
+            else:
+                self.fail(f"({a.i}, {a.j}) is not next to ({b.i}, {b.j})")
+            self.assertFalse(m.cell_wall_exists(a.i, a.j, wall))
+
+    def test_cell_grid(self):
+        """
+        test_cell_grid tests that the CellGrid keeps track of the walls and
+        the visitors of each cell independently.
+        """
+        grid = CellGrid(height=3, width=4)
+        index = grid.index(1, 2)
+        self.assertEqual(index, 6)
+
+        for wall in CellWallLabels:
+            self.assertTrue(grid.wall_exists(index, wall))
+
+        grid.configure_walls(index, top=False, right=False)
+        self.assertFalse(grid.wall_exists(index, CellWallLabels.TOP))
+        self.assertTrue(grid.wall_exists(index, CellWallLabels.BOTTOM))
+        self.assertTrue(grid.wall_exists(index, CellWallLabels.LEFT))
+        self.assertFalse(grid.wall_exists(index, CellWallLabels.RIGHT))
+        self.assertTrue(grid.wall_exists(index + 1, CellWallLabels.LEFT))
+
+        grid.configure_walls(index, top=True)
+        self.assertTrue(grid.wall_exists(index, CellWallLabels.TOP))
+
+        grid.mark_as_visited_by(index, "generator")
+        grid.mark_as_visited_by(index, "solver")
+        grid.mark_as_visited_by(index + 1, "solver")
+        grid.unmark_visited("solver")
+        self.assertTrue(grid.was_visited_by(index, "generator"))
+        self.assertFalse(grid.was_visited_by(index, "solver"))
+        self.assertFalse(grid.was_visited_by(index + 1, "solver"))
+
+        with self.assertRaises(ValueError):
+            grid.mark_as_visited_by(index, "unknown")
+
+        # The slots of the visitors are checked once and then used without
+        # checking them again.
+        slot = visitor_slot("solver")
+        self.assertEqual(slot, VISITORS.index("solver"))
+        grid.mark_visited(index + 2, slot)
+        self.assertTrue(grid.was_visited_by(index + 2, "solver"))
+        self.assertTrue(grid.was_visited(index + 2, slot))
+        self.assertFalse(grid.was_visited(index + 2, visitor_slot("generator")))
+        with self.assertRaises(ValueError):
+            visitor_slot("unknown")
+        for direction in maze.MazeDirection:
+            offset_i, offset_j = DIRECTION_STEPS[direction.value]
+            self.assertEqual(
+                index + grid.offsets[direction.value],
+                grid.index(1 + offset_i, 2 + offset_j),
+            )
+
+        # Clearing the marks only takes a new epoch, until the epoch wraps
+        # around and the stamps are cleared.
+        grid.epochs[visitor_slot("solver")] = MAX_EPOCH - 1
+        grid.mark_as_visited_by(index, "solver")
+        grid.unmark_visited("solver")
+        self.assertFalse(grid.was_visited_by(index, "solver"))
+        grid.mark_as_visited_by(index + 1, "solver")
+        grid.unmark_visited("solver")
+        self.assertEqual(grid.epochs[visitor_slot("solver")], 1)
+        for cell in range(len(grid.walls)):
+            self.assertFalse(grid.was_visited_by(cell, "solver"))
+
+        grid.reset()
+        self.assertFalse(grid.was_visited_by(index, "generator"))
+        self.assertTrue(grid.wall_exists(index, CellWallLabels.RIGHT))
+
+    def test_headless_maze(self):
+        """
+        test_headless_maze tests that a maze without graphics can be
+        generated and solved repeatedly without any drawing taking place.
+        """
+        m = maze.Maze(0, 0, 12, 15, 2, 2, None, 21)
+        self.assertTrue(m.is_headless())
+        s = solver.Solver(m, seed=4)
+
+        with mock.patch.object(m, "_draw_cell") as draw_cell, \
+                mock.patch.object(m, "draw_path_between") as draw_path:
+            for _ in range(2):
+                m.generate()
+                for solve_method in (s.solve_with_bfs, s.solve_with_dfs):
+                    for _ in range(2):
+                        result = s.solve(solve_method, True)
+                        self.assert_valid_path(m, result.path)
+                m.reset_solution("solver")
+                self.assertFalse(m.cell_was_visited_by(0, 0, "solver"))
+
+        draw_cell.assert_not_called()
+        draw_path.assert_not_called()
+
+    def test_maze_wall_lines(self):
+        """
+        test_maze_wall_lines tests that the walls of the maze are merged
+        into as few lines as possible.
+        """
+        height = 3
+        width = 4
+        m = maze.Maze(10, 20, height, width, 5, 5, None, 2)
+        m._create_cell_grid()
+        lines = m._wall_lines()
+        self.assertEqual(len(lines), (height + 1) + (width + 1))
+        self.assertEqual(
+            (lines[0].point_a.x, lines[0].point_a.y),
+            (10, 20),
+        )
+        self.assertEqual(
+            (lines[0].point_b.x, lines[0].point_b.y),
+            (10 + (width * 5), 20),
+        )
+
+        # Each wall is drawn exactly once across all lines.
+        m = maze.Maze(0, 0, 20, 30, 2, 2, None, 2)
+        m.generate()
+        walls = 0
+        for i in range(20):
+            for j in range(30):
+                walls += m.cell_wall_exists(i, j, CellWallLabels.TOP)
+                walls += m.cell_wall_exists(i, j, CellWallLabels.LEFT)
+            walls += m.cell_wall_exists(i, 29, CellWallLabels.RIGHT)
+        for j in range(30):
+            walls += m.cell_wall_exists(19, j, CellWallLabels.BOTTOM)
+        length = 0
+        for line in m._wall_lines():
+            length += abs(line.point_b.x - line.point_a.x)
+            length += abs(line.point_b.y - line.point_a.y)
+        self.assertEqual(length, walls * 2)
+
+    def test_animated_steps(self):
+        """
+        test_animated_steps tests that the generator and the solvers yield
+        step events when the maze is animated and none when it is not.
+        """
+        for animate in (True, False):
+            m = maze.Maze(0, 0, 8, 8, 2, 2, mock.Mock(), 6, animate)
+            kinds = set(e.kind for e in m.generate_steps())
+            if animate:
+                self.assertEqual(kinds, {maze.StepEventKind.CELL})
+            else:
+                self.assertEqual(kinds, set())
+
+            s = solver.Solver(m)
+            steps = s.solve_steps(s.solve_with_dfs)
+            kinds = set()
+            while True:
+                try:
+                    kinds.add(next(steps).kind)
+                except StopIteration as stop:
+                    self.assert_valid_path(m, stop.value.path)
+                    break
+            if animate:
+                self.assertIn(maze.StepEventKind.VISIT, kinds)
+            else:
+                self.assertEqual(kinds, set())
+
+    def test_batch(self):
+        """
+        test_batch tests that a batch of jobs run across worker processes
+        gives the same results as running each job on its own.
+        """
+        jobs = [
+            batch.Job(12, 15, generator, solver_name, seed)
+            for seed, (generator, solver_name) in enumerate(
+                zip(list(GENERATORS) * 2, list(solver.SOLVERS) * 4)
+            )
+        ]
+        results = list(batch.run_batch(jobs, workers=2, chunk_size=3))
+        self.assertEqual(len(results), len(jobs))
+
+        expected = sorted(
+            (result.job.seed, result.path_length, result.cells_visited)
+            for result in map(batch.run_job, jobs)
         )
+        self.assertEqual(
+            sorted(
+                (result.job.seed, result.path_length, result.cells_visited)
+                for result in results
+            ),
+            expected,
+        )
+
+        lines = ['{"height": 3, "width": 4, "solver": "dfs", "seed": 1}', ""]
+        job, = batch.read_jobs(lines)
+        self.assertEqual(job.to_dict(), batch.Job(3, 4, solver="dfs", seed=1).to_dict())
+
+        with self.assertRaises(ValueError):
+            batch.Job(3, 4, solver="unknown")
+        with self.assertRaises(ValueError):
+            batch.Job(0, 4)
+        for workers, chunk_size in ((0, None), (-1, 2), (2, 0)):
+            with self.assertRaises(ValueError):
+                list(batch.run_batch(jobs, workers=workers, chunk_size=chunk_size))
+
+    def test_cli(self):
+        """
+        test_cli tests that the command-line interface generates and solves
+        a maze, writes the results as JSON and never imports tkinter.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            code = (
+                "import sys, cli; "
+                f"cli.main(['--height', '9', '--width', '7', '--seed', '4', '--output', {output!r}]); "
+                "print('tkinter' in sys.modules)"
+            )
+            process = subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+            self.assertEqual(process.stdout.strip(), "False")
+
+            with open(output, encoding="utf-8") as results_file:
+                results = json.load(results_file)
+        self.assertEqual(results["height"], 9)
+        self.assertEqual(results["width"], 7)
+        self.assertEqual(results["seed"], 4)
+        self.assertTrue(results["solved"])
+        self.assertGreaterEqual(results["path_length"], 9 + 7 - 1)
+        self.assertIn("generate_time", results)
+
+        # A loaded maze reports how long it took to load, and a maze must
+        # have at least one row and one column.
+        import cli
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.bin")
+            output = os.path.join(directory, "results.json")
+            cli.main(["--height", "5", "--width", "6", "--save", path, "--output", output])
+            cli.main(["--load", path, "--output", output])
+            with open(output, encoding="utf-8") as results_file:
+                results = json.load(results_file)
+        self.assertIn("load_time", results)
+        self.assertNotIn("generate_time", results)
+        self.assertEqual((results["height"], results["width"]), (5, 6))
+
+        for argv in (["--height", "0"], ["--width", "-3"]):
+            with mock.patch("sys.stderr", io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    cli.main(argv)
+            self.assertIn("at least 1", stderr.getvalue())
+
+    def test_core_modules_do_not_import_tkinter(self):
+        """
+        test_core_modules_do_not_import_tkinter tests that the maze engine
+        can be imported without tkinter, and that Graphics implements every
+        method of the Renderer interface.
+        """
+        code = (
+            "import sys, cell, line, grid, generators, maze, solver, mazefile, "
+            "stream, batch, renderer, treeindex; print('tkinter' in sys.modules)"
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        self.assertEqual(process.stdout.strip(), "False")
+
+        from graphics import Graphics
+        self.assertFalse(Graphics.__abstractmethods__)
+
+        class PartialRenderer(renderer.Renderer):
+            def refresh(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            PartialRenderer()
+
+    def test_solvers_reuse_their_buffers(self):
+        """
+        test_solvers_reuse_their_buffers tests that the solvers find the
+        shortest paths between many pairs of positions while reusing their
+        lists from one solve to the next.
+        """
+        m = maze.Maze(0, 0, 12, 14, 2, 2, None, 9)
+        m.generate("kruskal")
+        index = treeindex.TreeIndex(m)
+        s = solver.Solver(m, seed=2)
+        rng = random.Random(5)
+
+        def position():
+            return maze.MazePosition(rng.randrange(12), rng.randrange(14), 11, 13)
+
+        buffers = None
+        for _ in range(30):
+            start = position()
+            end = position()
+            for name in ("bfs", "a-star", "bidirectional-bfs"):
+                result = s.solve(s.get_solve_method(name), start=start, end=end)
+                self.assertEqual(result.path, index.path(start, end), name)
+            if buffers is None:
+                buffers = (s._parents, s._costs, s._marks)
+            self.assertIs(s._parents, buffers[0])
+            self.assertIs(s._costs, buffers[1])
+            self.assertIs(s._marks, buffers[2])
+
+        # The marks are cleared when they run out.
+        s._mark = solver.MAX_MARK
+        for name in ("a-star", "bidirectional-bfs"):
+            result = s.solve(s.get_solve_method(name), start=start, end=end)
+            self.assertEqual(result.path, index.path(start, end), name)
+        self.assertEqual(s._mark, 2)
+
+    def test_solvers_share_a_maze(self):
+        """
+        test_solvers_share_a_maze tests that a solver is not blocked by the
+        cells another solver visited on the same maze.
+        """
+        m = maze.Maze(0, 0, 30, 30, 2, 2, None, 3)
+        m.generate()
+
+        def position(i, j):
+            return maze.MazePosition(i, j, 29, 29)
+
+        first = solver.Solver(m)
+        first.solve(first.solve_with_bfs, end=position(0, 1))
+        index = treeindex.TreeIndex(m)
+        for name in solver.SOLVERS:
+            second = solver.Solver(m)
+            result = second.solve(
+                second.get_solve_method(name),
+                start=position(0, 3),
+                end=position(0, 0),
+            )
+            self.assertTrue(result, name)
+            if name != "dfs":
+                self.assertEqual(
+                    result.path_length,
+                    index.distance(position(0, 3), position(0, 0)) + 1,
+                    name,
+                )
+
+    def test_entrance_exit_and_nearest_goal(self):
+        """
+        test_entrance_exit_and_nearest_goal tests that the entrance and the
+        exit can be moved, that the solvers can solve between any two
+        positions, and that the multi-goal search finds the nearest goal.
+        """
+        m = maze.Maze(0, 0, 6, 7, 2, 2, None, 4)
+        m.set_entrance(3, 0)
+        m.set_exit(2, 5)
+        m.generate("kruskal")
+        self.assertFalse(m.cell_wall_exists(3, 0, CellWallLabels.LEFT))
+        self.assertTrue(m.cell_wall_exists(0, 0, CellWallLabels.TOP))
+        self.assertTrue(m.cell_wall_exists(5, 6, CellWallLabels.BOTTOM))
+        with self.assertRaises(ValueError):
+            m.set_entrance(6, 0)
+        with self.assertRaises(ValueError):
+            m.set_exit(0, -1)
+
+        s = solver.Solver(m, seed=1)
+        lengths = set()
+        for name in solver.SOLVERS:
+            result = s.solve(s.get_solve_method(name))
+            self.assertEqual((result.path[0].i, result.path[0].j), (3, 0))
+            self.assertEqual((result.path[-1].i, result.path[-1].j), (2, 5))
+            if name != "dfs":
+                lengths.add(result.path_length)
+        self.assertEqual(len(lengths), 1)
+
+        def position(i, j):
+            return maze.MazePosition(i, j, 5, 6)
+
+        # Loading a smaller maze moves an entrance or an exit outside of it
+        # back to its default position.
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.bin")
+            small = maze.Maze(0, 0, 5, 4, 2, 2, None, 2)
+            small.generate()
+            small.save(path)
+            loaded = maze.Maze(0, 0, 9, 9, 2, 2, None)
+            loaded.set_entrance(1, 0)
+            loaded.set_exit(8, 8)
+            loaded.load(path)
+            self.assertEqual(loaded.get_entrance(), maze.MazePosition(1, 0, 4, 3))
+            self.assertEqual(loaded.get_exit(), maze.MazePosition(4, 3, 4, 3))
+            loaded_solver = solver.Solver(loaded)
+            for name in solver.SOLVERS:
+                result = loaded_solver.solve(loaded_solver.get_solve_method(name))
+                self.assertTrue(result, name)
+            loaded.close()
+
+        result = s.solve(s.solve_with_bfs, start=position(5, 6), end=position(0, 0))
+        self.assertEqual((result.path[0].i, result.path[0].j), (5, 6))
+        self.assertEqual((result.path[-1].i, result.path[-1].j), (0, 0))
+        with self.assertRaises(ValueError):
+            s.solve(s.solve_with_bfs, end=position(6, 0))
+
+        rng = random.Random(9)
+        for _ in range(20):
+            start = position(rng.randrange(6), rng.randrange(7))
+            goals = [position(rng.randrange(6), rng.randrange(7)) for _ in range(4)]
+            nearest = s.solve_nearest(goals, start=start)
+            separate = [s.solve(s.solve_with_bfs, start=start, end=goal) for goal in goals]
+            shortest = min(separate, key=lambda result: result.path_length)
+            self.assertEqual(nearest.path_length, shortest.path_length)
+            self.assertEqual(nearest.path[0], start)
+            self.assertIn(nearest.path[-1], goals)
+            self.assertLessEqual(nearest.cells_visited, shortest.cells_visited)
+
+        result = s.solve_nearest([position(0, 0), position(3, 0)])
+        self.assertEqual(result.path, [position(3, 0)])
+        with self.assertRaises(ValueError):
+            s.solve_nearest([])
+        with self.assertRaises(ValueError):
+            s.solve_nearest([position(0, 7)])
+
+    def test_tree_index(self):
+        """
+        test_tree_index tests that the paths and distances between any two
+        cells of a perfect maze found with a TreeIndex are the paths found
+        by the breadth-first search, and that mazes which are not perfect
+        are rejected.
+        """
+        rng = random.Random(6)
+        for generator in GENERATORS:
+            for height, width in ((1, 1), (1, 8), (8, 1), (13, 11)):
+                m = maze.Maze(0, 0, height, width, 2, 2, None, 2)
+                m.generate(generator)
+                index = treeindex.TreeIndex(m)
+                s = solver.Solver(m)
+
+                def position(i, j):
+                    return maze.MazePosition(i, j, height - 1, width - 1)
+
+                expected = s.solve(s.solve_with_bfs)
+                self.assertEqual(index.path(position(0, 0), expected.path[-1]), expected.path)
+                for _ in range(20):
+                    a = position(rng.randrange(height), rng.randrange(width))
+                    b = position(rng.randrange(height), rng.randrange(width))
+                    m.reset_solution("solver")
+                    expected = m.run_steps(s.solve_with_bfs(a, b))
+                    path = index.path(a, b)
+                    self.assertEqual(path, expected.path)
+                    self.assertEqual(index.distance(a, b), len(path) - 1)
+                    self.assertEqual(index.distance(b, a), len(path) - 1)
+                    self.assertEqual(
+                        index.depth(a) + index.depth(b)
+                        - (2 * index.depth(index.lowest_common_ancestor(a, b))),
+                        len(path) - 1,
+                    )
+
+        # The index can be rooted at any cell.
+        m = maze.Maze(0, 0, 9, 9, 2, 2, None, 1)
+        m.generate("wilson")
+        centre = maze.MazePosition(4, 4, 8, 8)
+        index = treeindex.TreeIndex(m, root=centre)
+        self.assertEqual(index.depth(centre), 0)
+        corner = maze.MazePosition(8, 8, 8, 8)
+        self.assertEqual(index.depth(corner), len(index.path(centre, corner)) - 1)
+        with self.assertRaises(ValueError):
+            index.distance(centre, maze.MazePosition(9, 0, 9, 8))
+
+        # A loop or a cell that cannot be reached is rejected.
+        walls = m.get_walls()
+        for cell in range(len(walls)):
+            if walls[cell] & grid.WALL_BITS[CellWallLabels.RIGHT] and cell % 9 < 8:
+                break
+        walls[cell] &= 15 ^ grid.WALL_BITS[CellWallLabels.RIGHT]
+        walls[cell + 1] &= 15 ^ grid.WALL_BITS[CellWallLabels.LEFT]
+        with self.assertRaises(ValueError):
+            treeindex.TreeIndex(m)
+        m = maze.Maze(0, 0, 3, 3, 2, 2, None)
+        m.load_rows([bytearray([15] * 3)] * 3)
+        with self.assertRaises(ValueError):
+            treeindex.TreeIndex(m)
+
+    @unittest.skipIf(analysis is None, "the analysis needs NumPy")
+    def test_analysis(self):
+        """
+        test_analysis tests that the statistics of a maze agree with the
+        statistics counted one cell at a time, for perfect mazes, for a
+        maze loaded from a maze file and for a maze with loops.
+        """
+        moves = (
+            (CellWallLabels.TOP, -1, 0),
+            (CellWallLabels.RIGHT, 0, 1),
+            (CellWallLabels.BOTTOM, 1, 0),
+            (CellWallLabels.LEFT, 0, -1),
+        )
+
+        def neighbours(m, i, j):
+            height, width = m.get_last_i() + 1, m.get_last_j() + 1
+            for wall, di, dj in moves:
+                if 0 <= i + di < height and 0 <= j + dj < width:
+                    if not m.cell_wall_exists(i, j, wall):
+                        yield i + di, j + dj
+
+        def assert_statistics(m, statistics):
+            height, width = m.get_last_i() + 1, m.get_last_j() + 1
+            degrees = {
+                (i, j): len(list(neighbours(m, i, j)))
+                for i in range(height)
+                for j in range(width)
+            }
+            self.assertEqual(
+                statistics.dead_ends,
+                sum(degree == 1 for degree in degrees.values()),
+            )
+            self.assertEqual(
+                statistics.junctions,
+                sum(degree >= 3 for degree in degrees.values()),
+            )
+            self.assertEqual(
+                int(statistics.corridor_lengths.sum()),
+                sum(degree == 2 for degree in degrees.values()),
+            )
+
+            entrance = m.get_entrance()
+            distances = {(entrance.i, entrance.j): 0}
+            queue = [(entrance.i, entrance.j)]
+            for i, j in queue:
+                for neighbour in neighbours(m, i, j):
+                    if neighbour not in distances:
+                        distances[neighbour] = distances[(i, j)] + 1
+                        queue.append(neighbour)
+            for i in range(height):
+                for j in range(width):
+                    self.assertEqual(
+                        statistics.distances[i, j],
+                        distances.get((i, j), -1),
+                    )
+            self.assertEqual(
+                int(statistics.distance_histogram().sum()),
+                len(distances),
+            )
+
+        for generator in GENERATORS:
+            for height, width in ((1, 1), (1, 9), (9, 1), (15, 12)):
+                m = maze.Maze(0, 0, height, width, 2, 2, None, 3)
+                m.generate(generator)
+                assert_statistics(m, analysis.analyse_maze(m))
+
+        # The distances are measured from the entrance wherever it is.
+        m = maze.Maze(0, 0, 10, 8, 2, 2, None, 5)
+        m.set_entrance(5, 0)
+        m.generate()
+        statistics = analysis.analyse_maze(m)
+        self.assertEqual(statistics.distances[5, 0], 0)
+        assert_statistics(m, statistics)
+
+        # The walls can come straight from a maze file.
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.bin")
+            m = maze.Maze(0, 0, 21, 13, 2, 2, None, 8)
+            m.generate("kruskal")
+            m.save(path)
+            loaded = maze.Maze(0, 0, 1, 1, 2, 2, None)
+            loaded.load(path)
+            assert_statistics(loaded, analysis.analyse_maze(loaded))
+            loaded.close()
+
+        # The corridors of a single path are one corridor between the two
+        # dead ends at the entrance and the exit.
+        m = maze.Maze(0, 0, 1, 6, 2, 2, None)
+        m.generate("binary-tree")
+        statistics = analysis.analyse_maze(m)
+        self.assertEqual(statistics.dead_ends, 2)
+        self.assertEqual(statistics.corridor_lengths.tolist(), [4])
+        self.assertEqual(statistics.distances.tolist(), [[0, 1, 2, 3, 4, 5]])
+
+        # Knocking down walls makes loops, so the maze is no longer a tree.
+        m = maze.Maze(0, 0, 12, 12, 2, 2, None, 4)
+        m.generate("recursive-backtracker")
+        walls = m.get_walls()
+        for i, j in ((3, 3), (5, 8), (10, 1), (0, 10)):
+            walls[(i * 12) + j] &= 15 ^ grid.WALL_BITS[CellWallLabels.RIGHT]
+            walls[(i * 12) + j + 1] &= 15 ^ grid.WALL_BITS[CellWallLabels.LEFT]
+        assert_statistics(m, analysis.analyse_maze(m))
+
+        # A ring of cells cut off from the rest of the maze is a corridor
+        # with no ends, and its cells cannot be reached.
+        rows = [bytearray([15] * 4) for _ in range(4)]
+        rows[1][1:3] = bytes([15 ^ 8 ^ 2, 15 ^ 4 ^ 2])
+        rows[2][1:3] = bytes([15 ^ 8 ^ 1, 15 ^ 4 ^ 1])
+        m = maze.Maze(0, 0, 4, 4, 2, 2, None)
+        m.load_rows(rows)
+        statistics = analysis.analyse_maze(m)
+        self.assertEqual(statistics.corridor_lengths.tolist(), [4])
+        self.assertEqual(statistics.distances[1, 1], -1)
+        assert_statistics(m, statistics)
+
+    def test_scheduler(self):
+        """
+        test_scheduler tests that the scheduler advances the step generator
+        frame by frame and that it can be paused, resumed and cancelled.
+        """
+        def steps(count):
+            for n in range(count):
+                yield n
+            return "done"
+
+        widget = FakeWidget()
+        events = []
+        results = []
+        scheduler = Scheduler(widget, fps=60, steps_per_frame=2)
+        scheduler.start(steps(5), events.append, results.append)
+        self.assertTrue(scheduler.is_running())
+
+        widget.run_next()
+        self.assertEqual(events, [0, 1])
+
+        scheduler.pause()
+        self.assertTrue(scheduler.is_paused())
+        self.assertEqual(widget.callbacks, {})
+
+        scheduler.resume()
+        scheduler.set_steps_per_frame(3)
+        widget.run_next()
+        self.assertEqual(events, [0, 1, 2, 3, 4])
+        self.assertEqual(results, [])
+        widget.run_next()
+        self.assertEqual(results, ["done"])
+        self.assertFalse(scheduler.is_running())
+        self.assertEqual(widget.callbacks, {})
+
+        scheduler.start(steps(5), events.append, results.append)
+        scheduler.cancel()
+        self.assertFalse(scheduler.is_running())
+        self.assertEqual(widget.callbacks, {})
+
+    def test_maze_wall_ids(self):
+        """
+        test_maze_wall_ids tests that each wall has a single ID that is
+        shared by the cells on either side of it, and that generating the
+        maze again draws the same walls.
+        """
+        height = 4
+        width = 6
+        graphics = mock.Mock()
+        m = maze.Maze(0, 0, height, width, 2, 2, graphics, 1)
+
+        ids = set()
+        for i in range(height):
+            for j in range(width):
+                wall_ids = m._wall_ids(i, j)
+                ids.update(wall_ids.values())
+                if i < height - 1:
+                    self.assertEqual(
+                        wall_ids[CellWallLabels.BOTTOM],
+                        m._wall_ids(i + 1, j)[CellWallLabels.TOP],
+                    )
+                if j < width - 1:
+                    self.assertEqual(
+                        wall_ids[CellWallLabels.RIGHT],
+                        m._wall_ids(i, j + 1)[CellWallLabels.LEFT],
+                    )
+        self.assertEqual(
+            len(ids),
+            ((height + 1) * width) + (height * (width + 1)),
+        )
+        self.assertEqual(ids, set(range(len(ids))))
+
+        drawn = []
+        for _ in range(2):
+            graphics.reset_mock()
+            m.generate()
+            drawn.append(set())
+            for call in graphics.draw_cell_walls.call_args_list:
+                drawn[-1].update(call.args[0].values())
+            graphics.clear_all.assert_not_called()
+        self.assertEqual(drawn[0], ids)
+        self.assertEqual(drawn[1], ids)
+
+    def test_animated_generation_replaces_merged_walls(self):
+        """
+        test_animated_generation_replaces_merged_walls tests that the walls
+        drawn in a single pass are removed when the maze is generated again
+        with animation enabled.
+        """
+        from graphics import Graphics
+
+        class FakeCanvas(Graphics):
+            def __init__(self):
+                self._path_tag = "path"
+                self._cell_wall_tag = "cell_wall"
+                self._wall_items = {}
+                self.items = {}
+                self.created = 0
+
+            def create_line(self, *coordinates, **options):
+                self.created += 1
+                self.items[self.created] = options
+                return self.created
+
+            def itemconfigure(self, item, **options):
+                self.items[item].update(options)
+
+            def delete(self, tag):
+                for item, options in list(self.items.items()):
+                    if tag == "all" or options["tags"] == tag:
+                        del self.items[item]
+
+            def refresh(self):
+                pass
+
+        canvas = FakeCanvas()
+        m = maze.Maze(0, 0, 4, 5, 2, 2, canvas, 3, False)
+        m.generate()
+        merged = set(canvas.items)
+        self.assertGreater(len(merged), 0)
+
+        m.set_animate(True)
+        m.generate()
+        self.assertFalse(merged & set(canvas.items))
+        self.assertEqual(set(canvas.items), set(canvas._wall_items.values()))
 
     def test_invalid_cell_exception(self):
         """
@@ -129,6 +1360,35 @@ class Tests(unittest.TestCase):
             result = case["m1"] == case["m2"]
             self.assertEqual(result, case["expected"])
 
+    def test_maze_position_index(self):
+        """
+        test_maze_position_index tests that a position can be converted to
+        the index of its cell and back, and that the neighbours of every
+        cell are found from the shared tables without leaving the grid.
+        """
+        height, width = 3, 4
+        cell_grid = CellGrid(height, width)
+        for index in range(height * width):
+            position = maze.MazePosition.from_index(index, height - 1, width - 1)
+            self.assertEqual(position.get_index(), index)
+            self.assertEqual(
+                position,
+                maze.MazePosition(index // width, index % width, height - 1, width - 1),
+            )
+
+            expected = []
+            for direction in maze.MazeDirection:
+                adjacent = position.get_adjacent_position(direction)
+                if adjacent is not None:
+                    expected.append(adjacent.get_index())
+            self.assertEqual(
+                [
+                    index + cell_grid.offsets[direction]
+                    for direction in cell_grid.inside_directions(index)
+                ],
+                expected,
+            )
+
     def test_maze_position_adjacent_positition(self):
         cases = [
             {
@@ -0,0 +1,183 @@
+from array import array
+from collections import deque
+from typing import List
+from cell import CellWallLabels
+from grid import WALL_BITS
+from maze import Maze, MazePosition
+
+
+class TreeIndex:
+    """
+    TreeIndex answers queries about the paths between any two cells of a
+    perfect maze, in which there is exactly one path between every pair of
+    cells.
+
+    The index is built once by searching the maze from the root cell (the
+    entrance by default), recording the parent and the depth of every cell.
+    The lowest common ancestor of two cells is the cell where the paths
+    from the root to each of them part ways, and it is found with binary
+    lifting: a table of the ancestors 1, 2, 4, 8, ... steps above every
+    cell. After that a distance query takes O(log n) steps and a path query
+    takes O(path length) steps, however many queries are made.
+    """
+
+    def __init__(self, game: Maze, root: MazePosition = None) -> None:
+        self._last_i = game.get_last_i()
+        self._last_j = game.get_last_j()
+        self._width = self._last_j + 1
+        cells = (self._last_i + 1) * self._width
+        if root is None:
+            root = game.get_entrance()
+        root_index = self._index(root)
+
+        parents = array("i", [-1]) * cells
+        depths = array("i", [0]) * cells
+        parents[root_index] = root_index
+        self._search(game.get_walls(), root_index, parents, depths)
+        if -1 in parents:
+            raise ValueError(
+                "The maze is not a perfect maze, some cells cannot be reached."
+            )
+
+        self._parents = parents
+        self._depths = depths
+
+        # _ancestors[k][index] is the ancestor 2**k steps above the cell at
+        # the index, or the root if the cell is not that deep. The table
+        # uses arrays of 32-bit integers because it holds a few entries for
+        # every cell.
+        self._ancestors: List[array] = [parents]
+        for _ in range(max(depths).bit_length() - 1):
+            above = self._ancestors[-1]
+            self._ancestors.append(array("i", [above[parent] for parent in above]))
+
+    def _search(self, walls, root: int, parents: array, depths: array) -> None:
+        """
+        searches the maze breadth-first from the root and records the parent
+        and the depth of every cell it reaches.
+        """
+        width = self._width
+        last_i = self._last_i
+        last_j = self._last_j
+        top = WALL_BITS[CellWallLabels.TOP]
+        bottom = WALL_BITS[CellWallLabels.BOTTOM]
+        left = WALL_BITS[CellWallLabels.LEFT]
+        right = WALL_BITS[CellWallLabels.RIGHT]
+
+        queue = deque([root])
+        while queue:
+            current = queue.popleft()
+            i, j = divmod(current, width)
+            current_walls = walls[current]
+            depth = depths[current] + 1
+            for blocked, inside, adjacent in (
+                (top, i > 0, current - width),
+                (bottom, i < last_i, current + width),
+                (left, j > 0, current - 1),
+                (right, j < last_j, current + 1),
+            ):
+                if (current_walls & blocked) or not inside:
+                    continue
+                if parents[adjacent] == -1:
+                    parents[adjacent] = current
+                    depths[adjacent] = depth
+                    queue.append(adjacent)
+                elif adjacent != parents[current]:
+                    raise ValueError(
+                        "The maze is not a perfect maze, it has more than one "
+                        "path between some of its cells."
+                    )
+
+    def _index(self, position: MazePosition) -> int:
+        """
+        returns the index of the cell at the specified position.
+        """
+        if not (0 <= position.i <= self._last_i and 0 <= position.j <= self._last_j):
+            raise ValueError(
+                f"The position ({position.i}, {position.j}) is outside the maze."
+            )
+
+        return (position.i * self._width) + position.j
+
+    def _position(self, index: int) -> MazePosition:
+        """
+        returns the maze position of the cell at the specified index.
+        """
+        return MazePosition.from_index(index, self._last_i, self._last_j)
+
+    def _lowest_common_ancestor(self, a: int, b: int) -> int:
+        """
+        returns the index of the lowest common ancestor of the cells at the
+        specified indices.
+        """
+        depths = self._depths
+        ancestors = self._ancestors
+        if depths[a] < depths[b]:
+            a, b = b, a
+
+        # Lift the deeper cell up to the depth of the other one.
+        difference = depths[a] - depths[b]
+        level = 0
+        while difference:
+            if difference & 1:
+                a = ancestors[level][a]
+            difference >>= 1
+            level += 1
+        if a == b:
+            return a
+
+        # Lift both cells as far as possible without them meeting, which
+        # leaves them just below their lowest common ancestor.
+        for above in reversed(ancestors):
+            if above[a] != above[b]:
+                a = above[a]
+                b = above[b]
+
+        return self._parents[a]
+
+    def depth(self, position: MazePosition) -> int:
+        """
+        returns the length of the path from the root to the specified
+        position.
+        """
+        return self._depths[self._index(position)]
+
+    def lowest_common_ancestor(self, a: MazePosition, b: MazePosition) -> MazePosition:
+        """
+        returns the position where the paths from the root to the two
+        positions part ways.
+        """
+        return self._position(self._lowest_common_ancestor(self._index(a), self._index(b)))
+
+    def distance(self, a: MazePosition, b: MazePosition) -> int:
+        """
+        returns the number of steps on the path between the two positions.
+        """
+        a = self._index(a)
+        b = self._index(b)
+        depths = self._depths
+        return depths[a] + depths[b] - (2 * depths[self._lowest_common_ancestor(a, b)])
+
+    def path(self, a: MazePosition, b: MazePosition) -> List[MazePosition]:
+        """
+        returns the path between the two positions as a list of positions,
+        starting with a and ending with b.
+        """
+        a = self._index(a)
+        b = self._index(b)
+        meeting = self._lowest_common_ancestor(a, b)
+        parents = self._parents
+
+        up: List[int] = []
+        while a != meeting:
+            up.append(a)
+            a = parents[a]
+        up.append(meeting)
+
+        down: List[int] = []
+        while b != meeting:
+            down.append(b)
+            b = parents[b]
+        down.reverse()
+
+        return [self._position(index) for index in up + down]